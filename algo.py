@@ -9,12 +9,51 @@ Alpha-Beta pruning algorithm implementation file.
 
 """
 
+import sys
+import time
+import pstats
+import cProfile
+import StringIO
+import threading
+
+from bitboard import BitBoard, _get_symmetries, _mobility
+from ttable import EXACT, LOWER, UPPER
+from moves import moves_from, reaches
+import endgame
+
 #=====================================================================#
 # 	                  Symbolic Constants 			      #
 #=====================================================================#
 NEG_INFINITY = -10000
 POS_INFINITY = 10000
 
+# nodes with at least this many plies left key the transposition table by
+# their canonical hash, so that all mirror images of a position share one
+# entry; below it the extra hashing would cost more than it saves
+CANONICAL_DEPTH = 3
+
+# the width of the null window of the Principal Variation Search; the
+# scores of different positions lie much further apart than this
+NULL_WINDOW = 0.01
+
+# the initial half-width of an aspiration window; it grows fourfold on
+# every failed search
+ASPIRATION_WINDOW = 25.0
+
+# the weight of the moves themselves against the moves after them in
+# hef_lookahead
+LOOKAHEAD_WEIGHT = 4
+
+# _eval_pos of every tile, by board length; see _get_eval_pos
+_eval_tables = {}
+
+class _PlyMoves(threading.local):
+    "The move lists _staged_moves fills in, one per ply; a set per thread."
+    def __init__(self):
+	self.lists = {}   # depth -> move list
+
+_ply_moves = _PlyMoves()
+
 #=====================================================================#
 # 	                  Private Functions                	      #
 #=====================================================================#
@@ -46,24 +85,36 @@ def _filter_move(who, move, board, move_table):
     else:
 	move_table.append(move)
 
-def _eval_pos(pos):
+def _eval_pos(pos, size=8):
     '''Evaluate a position solely based on its position.
     Score can be any element of the set: {-4, -3, -2, -1, 0}.
     The most negative score means the worst position.
 
     --- Function Arguments ---
     @pos: a position to be evaluated
+    @size: the board length
     @return: a score for that position
     '''
     score = 0
-    if pos[0]==0 or pos[0]==7: score -= 2
-    if pos[0]==1 or pos[0]==6: score -= 1
-    if pos[1]==0 or pos[1]==7: score -= 2
-    if pos[1]==1 or pos[1]==6: score -= 1
+    for x in pos:
+	edge = min(x, size-1-x)    # the distance to the nearest edge
+	if edge == 0:   score -= 2
+	elif edge == 1: score -= 1
     
     # return the negative of original score for sorting in descending manner
     return -score
 
+def _get_eval_pos(size):
+    '''Return _eval_pos of every tile of a board of length 'size' as a
+    dictionary, used as a sort key by the move generators; built once per
+    board size.'''
+
+    table = _eval_tables.get(size)
+    if table is None:
+	table = _eval_tables[size] = dict(((i, j), _eval_pos((i, j), size))
+					  for i in xrange(size) for j in xrange(size))
+    return table
+
 def _get_next_moves(who, pos, board, low, high):
     '''Return all the next possible moves for player at position 'pos'.
     This is a game-specific rountine.
@@ -138,72 +189,192 @@ def _get_next_moves(who, pos, board, low, high):
     # ------ sorting before returning ------
     # use a very simple sort comparison routine
     # to do a very basic sorting - based on intuition
-    return sorted(move_table, key=_eval_pos)
+    return sorted(move_table, key=_get_eval_pos(high-low+1).__getitem__)
 
-def _get_score(pos, board, low, high):
-    '''Return the number of possible moves a player can make at 
-    a given position 'pos', plus the number of degrees of freedom. 
-    This is a game-specific rountine.
+def _filter_symmetric(board, move_table):
+    '''Drop the moves equivalent to an earlier move of move_table under a
+    symmetry of the board; returns the filtered move_table.
+
+    If a symmetry (any of the 8 rotations and reflections of the square)
+    maps the position onto itself, it maps every move onto one leading to
+    a mirror image of the same child position, so only the first move of
+    every such group needs to be searched. Unlike _filter_move, which only
+    knows the 'x=y' axis and rescans the board for every move, this costs
+    two lookups unless both pawns sit on an axis of some symmetry.
 
     --- Function Arguments ---
-    @pos: position of pawn on board
-    @board: an array storing pawn positions
-    @low: lowest index bound for board, an int
-    @high: highest index bound for board, an int
-    @return: a integer score of position 'pos' 
+    @board: a Board or BitBoard object reference
+    @move_table: the moves from the current position
     '''
-  
-    mv_counts = 0
 
-    # possible moves in north
-    for i in xrange(1, pos[0]-low+1):
-	if not board[pos[0]-i][pos[1]]: # if that position is not taken/visited
-	    mv_counts += 1
-	else:
-	    break
-    # possible moves in north-east
-    for i in xrange(1, min(pos[0]-low, high-pos[1])+1):
-	if not board[pos[0]-i][pos[1]+i]: # if that position is not taken/visited
-	    mv_counts += 1
-	else:
-	    break
-    # possible moves in east
-    for i in xrange(1, high-pos[1]+1):
-	if not board[pos[0]][pos[1]+i]: # if that position is not taken/visited
-	    mv_counts += 1
-	else:
-	    break
-    # possible moves in south-east
-    for i in xrange(1, high-max(pos[0],pos[1])+1):
-	if not board[pos[0]+i][pos[1]+i]: # if that position is not taken/visited
-	    mv_counts += 1
-	else:
-	    break
-    # possible moves in south
-    for i in xrange(1, high-pos[0]+1):
-	if not board[pos[0]+i][pos[1]]: # if that position is not taken/visited
-	    mv_counts += 1
-	else:
-	    break
-    # possible moves in south-west
-    for i in xrange(1, min(high-pos[0], pos[1]-low)+1):
-	if not board[pos[0]+i][pos[1]-i]: 
-	    mv_counts += 1
-	else:
-	    break
-    # possible moves in west
-    for i in xrange(1, pos[1]-low+1):
-	if not board[pos[0]][pos[1]-i]: 
-	    mv_counts += 1
-	else:
-	    break
-    # possible moves in north-west
-    for i in xrange(1, min(pos[0],pos[1])-low+1):
-	if not board[pos[0]-i][pos[1]-i]: 
-	    mv_counts += 1
-	else:
-	    break
-    return mv_counts
+    syms = board.symmetries()
+    if not syms: return move_table
+
+    n = board.size+1
+    perms = _get_symmetries(n)[0]
+    filtered, seen = [], set()
+    for move in move_table:
+	sq = move[0]*n + move[1]
+	if sq in seen: continue
+	filtered.append(move)
+	seen.add(sq)
+	seen.update(perms[s][sq] for s in syms)
+    return filtered
+
+def _get_next_moves_bb(who, pos, board):
+    '''Return all the next possible moves for player at position 'pos'
+    from the ray tables and the occupancy mask of 'board'. The moves come
+    in the order of _get_next_moves, minus the symmetric duplicates
+    dropped by _filter_symmetric.
+
+    --- Function Arguments ---
+    @who: whose ply is it on current board
+    @pos: position of the latest move
+    @board: a BitBoard or Board object reference
+    @return: a list of all possible next moves
+    '''
+
+    return sorted(_filter_symmetric(board, moves_from(pos, board)),
+		  key=_get_eval_pos(board.size+1).__getitem__)
+
+def _ratio(num, den):
+    "The score hef gives for 'num' own moves against 'den' opponent moves."
+
+    if num == 0: return NEG_INFINITY
+    if den == 0: return POS_INFINITY
+    return 100*(float(num) / den)
+
+def _difference(num, den):
+    "The score hef_difference gives for 'num' own moves against 'den' opponent moves."
+
+    if num == 0: return NEG_INFINITY
+    if den == 0: return POS_INFINITY
+    return num - den
+
+def _child_score(move, n, bits, rays, rays_oppt, occupied):
+    '''Return -hef of the leaf reached by 'move', without making the move:
+    the move only adds its square to the occupied tiles and moves the pawn
+    there, so both mobilities are read off the ray tables with the child's
+    occupancy. rays_oppt are the rays of the opponent's pawn.'''
+
+    sq = move[0]*n + move[1]
+    child = occupied | bits[sq]
+    return -_ratio(_mobility(rays_oppt, child), _mobility(rays[sq], child))
+
+def _child_difference(move, n, bits, rays, rays_oppt, occupied):
+    "Same as _child_score, for hef_difference."
+
+    sq = move[0]*n + move[1]
+    child = occupied | bits[sq]
+    return -_difference(_mobility(rays_oppt, child), _mobility(rays[sq], child))
+
+def _mobilities(whose_ply, board):
+    "Return the numbers of moves of player whose_ply and of the opponent."
+
+    return (board.get_mobility(board.get_position(whose_ply)),
+	    board.get_mobility(board.get_position('p1' if whose_ply=='p2' else 'p2')))
+
+def _lookahead(sq, n, bits, rays, occupied):
+    '''Return a tuple (the number of moves from square sq, the sum of the
+    numbers of moves from each of the squares moved to).'''
+
+    first = second = 0
+    for mask, moves, counts in rays[sq]:
+	for i, j in moves[mask & occupied]:
+	    to = i*n + j
+	    first += 1
+	    second += _mobility(rays[to], occupied | bits[to])
+    return first, second
+
+def _next_moves(who, board):
+    '''Return all the next possible moves for player 'who'. Board and
+    BitBoard both keep the occupancy mask the move generator works on.
+
+    --- Function Arguments ---
+    @who: whose ply is it on current board
+    @board: a Board or BitBoard object reference
+    @return: a list of all possible next moves
+    '''
+
+    return _get_next_moves_bb(who, board.get_position(who), board)
+
+def _tt_first(move_table, tt_move):
+    '''Move the best move stored in the transposition table (or any other
+    move to be tried first) to the front of move_table, if it is one of the
+    moves there.'''
+
+    if tt_move is not None and tt_move in move_table:
+	move_table.remove(tt_move)
+	move_table.insert(0, tt_move)
+    return move_table
+
+def _staged_moves(whose_ply, board, depth, tt_move, ordering):
+    '''Generate the moves of player whose_ply in the order alpha_beta
+    searches them, in stages: the table's move first, then the killer
+    moves, each one checked on its own ray only; the other moves are
+    generated and ordered only if none of these caused a beta-cutoff. The
+    order is the one _tt_first and ordering.order give the full move list.
+
+    The full move list is filled into the list kept for the ply (see
+    _PlyMoves), so the list is not allocated anew at every node. A position
+    with a symmetry has all its moves generated first, as the duplicates
+    _filter_symmetric drops depend on the static order.
+
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+    @board: a Board or BitBoard object reference
+    @depth: the remaining search depth, which stands for the ply
+    @tt_move: the move from the transposition table, or None
+    @ordering: optional MoveOrdering
+    @return: a generator of moves
+    '''
+
+    pos = board.get_position(whose_ply)
+    if board.symmetries():
+	move_table = _next_moves(whose_ply, board)
+	if ordering is not None: move_table = ordering.order(pos, move_table, depth)
+	for move in _tt_first(move_table, tt_move): yield move
+	return
+
+    tried = ()
+    if tt_move is not None and reaches(pos, tt_move, board):
+	tried = (tt_move,)
+	yield tt_move
+    if ordering is not None:
+	killers = ordering.killers.get(depth)
+	if killers:
+	    for killer in killers:
+		if killer is not None and killer not in tried and reaches(pos, killer, board):
+		    tried += (killer,)
+		    yield killer
+
+    lists = _ply_moves.lists
+    move_table = lists.get(depth)
+    if move_table is None: move_table = lists[depth] = []
+    moves_from(pos, board, move_table)
+    move_table.sort(key=_get_eval_pos(board.size+1).__getitem__)
+    if ordering is not None: ordering.order(pos, move_table, depth)
+    for move in move_table:
+	if move not in tried: yield move
+
+def _tt_key(whose_ply, board, depth):
+    '''Return the transposition table key of the position as a tuple
+    (key, symmetry): the canonical hash and the symmetry giving it at
+    nodes CANONICAL_DEPTH plies or more from the leaves, else the plain
+    hash and the identity (0).'''
+
+    if depth >= CANONICAL_DEPTH: return board.canonical_hash(whose_ply)
+    return board.get_hash(whose_ply), 0
+
+def _to_tt(board, move, sym):
+    "Map a move to the frame of symmetry 'sym', for storing it in the table."
+    if not sym or move is None: return move
+    return board.coords[board.to_canonical(move, sym)]
+
+def _from_tt(board, move, sym):
+    "Map a move read from the table back from the frame of symmetry 'sym'."
+    if not sym or move is None: return move
+    return board.from_canonical(move[0]*board.n + move[1], sym)
 
 def _make_move(board, who, move):
     '''Make the tentative move on board for player 'who'.
@@ -231,6 +402,218 @@ def _unmake_move(board, who, move):
 # 	                  Public Interface 			      #
 #=====================================================================#
 
+class SearchTimeout(Exception):
+    "Raised inside the search when its SearchBudget runs out."
+    pass
+
+class SearchBudget(object):
+    '''Class SearchBudget
+
+    The time and node budget of a search. alpha_beta counts every node it
+    visits and raises SearchTimeout once the budget is used up; the clock
+    is only read every CHECK_EVERY nodes. A search can also be stopped from
+    another thread with stop().
+    '''
+
+    CHECK_EVERY = 1024
+
+    def __init__(self, time_limit=None, max_nodes=None):
+	'''
+	@time_limit: the wall-clock budget in seconds, or None
+	@max_nodes: the maximum number of nodes to visit, or None
+	'''
+
+	self.deadline = time.time() + time_limit if time_limit else None
+	self.max_nodes = max_nodes
+	self.nodes = 0
+	self.stopped = False
+	self.next_check = self.CHECK_EVERY
+	if max_nodes: self.next_check = min(self.next_check, max_nodes)
+
+    def stop(self):
+	"Use the budget up at once; the search stops at its next node."
+
+	self.stopped = True
+	self.next_check = 0
+
+    def check(self):
+	"Raise SearchTimeout if the budget is used up; called by alpha_beta."
+
+	if self.stopped: raise SearchTimeout()
+	if self.max_nodes and self.nodes >= self.max_nodes: raise SearchTimeout()
+	if self.deadline and time.time() >= self.deadline: raise SearchTimeout()
+	self.next_check = self.nodes + self.CHECK_EVERY
+	if self.max_nodes: self.next_check = min(self.next_check, self.max_nodes)
+
+class MoveOrdering(object):
+    '''Class MoveOrdering
+
+    Killer moves and history heuristic for ordering moves in alpha_beta.
+    Every ply keeps the last two moves that caused a beta-cutoff there
+    (killers), and a history table maps (from, to) to a score raised by
+    depth*depth on each beta-cutoff. Moves are tried killers first, then
+    by history score, then by the static _eval_pos order. Passing no
+    MoveOrdering to the search turns both heuristics off.
+    '''
+
+    def __init__(self):
+	self.killers = {}   # depth -> [killer 1, killer 2]
+	self.history = {}   # (from, to) -> score
+
+    def new_search(self):
+	"Forget the killers and age the history scores; called at the root."
+
+	self.killers.clear()
+	for key, score in self.history.items():
+	    if score > 1: self.history[key] = score // 2
+	    else:         del self.history[key]
+
+    def order(self, pos, move_table, depth):
+	'''Return move_table sorted for searching.
+
+	--- Function Arguments ---
+	@pos: the position the moves are made from
+	@move_table: the moves in static order, from _next_moves
+	@depth: the remaining search depth, which stands for the ply
+	'''
+
+	history = self.history
+	if history:
+	    move_table.sort(key=lambda move: -history.get((pos, move), 0))
+	killers = self.killers.get(depth)
+	if killers:
+	    for killer in reversed(killers):
+		if killer in move_table:
+		    move_table.remove(killer)
+		    move_table.insert(0, killer)
+	return move_table
+
+    def cutoff(self, pos, move, depth):
+	"Record that 'move' from 'pos' caused a beta-cutoff at 'depth'."
+
+	killers = self.killers.get(depth)
+	if killers is None:
+	    self.killers[depth] = [move, None]
+	elif killers[0] != move:
+	    killers[1], killers[0] = killers[0], move
+	self.history[(pos, move)] = self.history.get((pos, move), 0) + depth*depth
+
+class SearchStats(object):
+    '''Class SearchStats
+
+    Statistics of a search, collected only if a SearchStats is passed to
+    it: nodes per ply, leaf evaluations, beta-cutoffs and how many of them
+    the first move caused, the time and score of every root move, and the
+    principal variation. One record is kept per alpha_beta_root call, so
+    an iterative deepening search gives one per iteration.
+    '''
+
+    def __init__(self):
+	self.iterations = []   # one dictionary per alpha_beta_root call
+	self.solved = False    # the endgame solver answered without a search
+
+    def new_iteration(self, depth):
+	"Start the record of a search to 'depth'; called by alpha_beta_root."
+
+	self.depth = depth
+	self.start = time.time()
+	self.nodes = [0] * (depth+1)   # ply -> nodes visited
+	self.leaves = 0                # leaf evaluations
+	self.cutoffs = 0               # beta-cutoffs
+	self.first_cutoffs = 0         # beta-cutoffs by the first move tried
+	self.root_moves = []           # (move, score, seconds)
+	self.tablebase_hits = 0        # nodes answered by the endgame tablebase
+	self.pv = [[] for i in xrange(depth+1)]   # ply -> best line found there
+
+    def enter(self, depth):
+	"Count a node at remaining 'depth'; called by alpha_beta."
+
+	ply = self.depth - depth
+	self.nodes[ply] += 1
+	self.pv[ply] = []
+
+    def cutoff(self, first):
+	"Count a beta-cutoff; 'first' tells if the first move caused it."
+
+	self.cutoffs += 1
+	if first: self.first_cutoffs += 1
+
+    def improve(self, depth, move):
+	"Record that 'move' is the best move so far at remaining 'depth'."
+
+	ply = self.depth - depth
+	self.pv[ply] = [move] + (self.pv[ply+1] if ply < self.depth else [])
+
+    def end_iteration(self, move, score):
+	"Close the record of the search; called by alpha_beta_root."
+
+	self.iterations.append({
+	    'depth': self.depth, 'move': move, 'score': score,
+	    'seconds': time.time() - self.start,
+	    'nodes': sum(self.nodes), 'nodes_per_ply': self.nodes,
+	    'leaves': self.leaves, 'cutoffs': self.cutoffs,
+	    'tablebase_hits': self.tablebase_hits,
+	    'first_cutoff_rate': float(self.first_cutoffs) / self.cutoffs if self.cutoffs else 0.0,
+	    'root_moves': self.root_moves, 'pv': self.pv[0]})
+
+    def branching_factor(self):
+	'''Return the effective branching factor: the growth of the node
+	count from one iteration to the next, or the depth-th root of the
+	node count if there was only one iteration.'''
+
+	if not self.iterations: return 0.0
+	last = self.iterations[-1]
+	if len(self.iterations) > 1 and self.iterations[-2]['nodes']:
+	    return float(last['nodes']) / self.iterations[-2]['nodes']
+	return last['nodes'] ** (1.0 / last['depth']) if last['depth'] else 0.0
+
+    def report(self):
+	"Return the statistics as a dictionary, e.g. to dump as JSON."
+	return {'solved': self.solved, 'iterations': self.iterations,
+		'branching_factor': self.branching_factor()}
+
+    def __str__(self):
+	"Return a human-readable summary of the deepest iteration."
+
+	if self.solved: return 'solved by the endgame solver'
+	if not self.iterations: return 'no search'
+	last = self.iterations[-1]
+	lines = ['depth %d: %d nodes in %.3fs (%.0f nodes/sec), %d leaves, ebf %.2f' % (
+		     last['depth'], last['nodes'], last['seconds'],
+		     last['nodes'] / (last['seconds'] or 1e-9), last['leaves'],
+		     self.branching_factor()),
+		 'cutoffs %d, first move %.0f%%' % (last['cutoffs'], 100*last['first_cutoff_rate']),
+		 'nodes per ply: %s' % ' '.join(str(n) for n in last['nodes_per_ply']),
+		 'pv: %s' % ' '.join('%d,%d' % move for move in last['pv'])]
+	for move, score, seconds in last['root_moves']:
+	    lines.append('  %s %8.2f %.3fs' % (move, score, seconds))
+	return '\n'.join(lines)
+
+def profile_search(func, *args, **kwargs):
+    '''Run a search (or any function) under cProfile and print the cost
+    per function.
+
+    --- Function Arguments ---
+    @func: the function to call, e.g. alpha_beta_root
+    @args: the positional arguments of func
+    @kwargs: the keyword arguments of func, plus optionally:
+	     profile_out: the file the report goes to; sys.stderr by default
+	     profile_sort: the pstats sort key; 'cumulative' by default
+	     profile_limit: the number of functions listed; 25 by default
+    @return: the return value of func
+    '''
+
+    out = kwargs.pop('profile_out', None) or sys.stderr
+    sort = kwargs.pop('profile_sort', 'cumulative')
+    limit = kwargs.pop('profile_limit', 25)
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    text = StringIO.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats(sort).print_stats(limit)
+    out.write(text.getvalue())
+    return result
+
 def hef(whose_ply, board):
     '''Heuristic Evaluation Function
 
@@ -244,26 +627,150 @@ def hef(whose_ply, board):
     @return: an integer score relative to the side being evaluated
     '''
     
-    opponent = 'p1' if whose_ply=='p2' else 'p2'
-
     # (number of possible moves of node/ply player)
     # _____________________________________________
     #
     #   (number of possible moves of opponents)
+    #
+    # numerator examined first; this is important for algorithm correctness
+    return _ratio(*_mobilities(whose_ply, board))
+
+def hef_batch(positions):
+    '''Evaluate a list of positions at once; the same as calling hef on
+    each, reading the mobilities straight off the ray tables.
+
+    @positions: a list of tuples (whose_ply, BitBoard object reference)
+    @return: a list of scores, in the order of positions
+    '''
+
+    scores = []
+    for whose_ply, board in positions:
+	n, rays, occupied = board.n, board.rays, board.occupied
+	pos_x, pos_o = board.pos_x, board.pos_o
+	num_x = _mobility(rays[pos_x[0]*n + pos_x[1]], occupied)
+	num_o = _mobility(rays[pos_o[0]*n + pos_o[1]], occupied)
+	if whose_ply == 'p1': scores.append(_ratio(num_x, num_o))
+	else:                 scores.append(_ratio(num_o, num_x))
+    return scores
+
+def hef_difference(whose_ply, board):
+    '''Evaluation function: the number of moves of the player to move less
+    the number of moves of the opponent. It orders positions much like
+    hef, in integer arithmetic without a division.
+
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+    @board: Board or BitBoard object reference; board state of current ply
+    @return: an integer score relative to the side being evaluated
+    '''
+
+    return _difference(*_mobilities(whose_ply, board))
+
+def hef_lookahead(whose_ply, board):
+    '''Evaluation function looking one move ahead: for each side, the
+    number of moves weighted by LOOKAHEAD_WEIGHT, plus the number of moves
+    from every square it can move to. It tells a pawn with many moves into
+    dead ends from one with moves into the open.
+
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+    @board: Board or BitBoard object reference; board state of current ply
+    @return: an integer score relative to the side being evaluated
+    '''
+
     pos_node = board.get_position(whose_ply)
-    pos_oppt = board.get_position(opponent)
-    num = _get_score(pos_node, board.get_board(), 0, 7)
-    den = _get_score(pos_oppt, board.get_board(), 0, 7)
+    pos_oppt = board.get_position('p1' if whose_ply=='p2' else 'p2')
+    n, bits, rays, occupied = board.size+1, board.bits, board.rays, board.occupied
+    num, num_next = _lookahead(pos_node[0]*n + pos_node[1], n, bits, rays, occupied)
+    den, den_next = _lookahead(pos_oppt[0]*n + pos_oppt[1], n, bits, rays, occupied)
 
-    # numerator examined first; this is important for algorithm correctness
     if num == 0: return NEG_INFINITY
     if den == 0: return POS_INFINITY
+    return LOOKAHEAD_WEIGHT*(num - den) + (num_next - den_next)
 
-    # otherwise return the ratio	
-    return 100*(float(num) / den)
+def hef_area(whose_ply, board):
+    '''Evaluation function estimating the area each pawn controls: the
+    empty tiles it reaches in fewer king steps than the other pawn, both
+    spreading over empty tiles at once; tiles reached by both in the same
+    step belong to neither. The score is the difference of the areas.
 
-def alpha_beta(whose_ply, board, depth, alpha, beta):
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+    @board: Board or BitBoard object reference; board state of current ply
+    @return: an integer score relative to the side being evaluated
+    '''
+
+    num, den = _mobilities(whose_ply, board)
+    if num == 0: return NEG_INFINITY
+    if den == 0: return POS_INFINITY
+
+    n = board.size+1
+    full, not_first, not_last = endgame._get_masks(n)
+    pos_node = board.get_position(whose_ply)
+    pos_oppt = board.get_position('p1' if whose_ply=='p2' else 'p2')
+    node, oppt = board.bits[pos_node[0]*n + pos_node[1]], board.bits[pos_oppt[0]*n + pos_oppt[1]]
+    free = ~board.occupied & full
+    area_node = area_oppt = 0
+    while node or oppt:
+	row = node | ((node << 1) & not_first) | ((node >> 1) & not_last)
+	node = (row | (row << n) | (row >> n)) & free
+	row = oppt | ((oppt << 1) & not_first) | ((oppt >> 1) & not_last)
+	oppt = (row | (row << n) | (row >> n)) & free
+	free &= ~(node | oppt)
+	both = node & oppt
+	node ^= both
+	oppt ^= both
+	area_node += bin(node).count('1')
+	area_oppt += bin(oppt).count('1')
+    return area_node - area_oppt
+
+def register_evaluator(name, evaluate, child_score=None):
+    '''Make an evaluation function available by name, e.g. to selfplay.
+
+    --- Function Arguments ---
+    @name: the name of the evaluation function
+    @evaluate: the evaluation function; same signature as hef
+    @child_score: optional frontier version of it, taking the arguments of
+		  _child_score and returning -evaluate of the child position
+		  without setting it up; alpha_beta uses it at frontier nodes
+    '''
+
+    EVALUATORS[name] = evaluate
+    if child_score is not None: _child_scores[evaluate] = child_score
+
+# leaf evaluation functions, by name; see register_evaluator
+EVALUATORS = {}
+
+# frontier versions of the evaluation functions, by evaluation function
+_child_scores = {}
+
+# the endgame tablebase alpha_beta probes; see use_tablebase
+_tablebase = None
+
+def use_tablebase(tablebase):
+    '''Let alpha_beta look positions up in an endgame tablebase; None
+    switches the lookups off. The setting holds for every search of the
+    process.
+
+    @tablebase: a tablebase.Tablebase object reference, or None
+    '''
+
+    global _tablebase
+    _tablebase = tablebase
+
+register_evaluator('hef', hef, _child_score)
+register_evaluator('difference', hef_difference, _child_difference)
+register_evaluator('lookahead', hef_lookahead)
+register_evaluator('area', hef_area)
+
+def alpha_beta(whose_ply, board, depth, alpha, beta, tt=None, budget=None,
+	       ordering=None, evaluate=hef, stats=None, pvs=False):
     '''Negamax implementation of Alpha-Beta pruning algorithm.
+
+    With 'pvs' set it runs as a Principal Variation Search: only the first
+    move gets the full window, the others are searched with a null window
+    just proving they are no better, and searched again with the full
+    window if that fails.
     
     --- Function Arguments ---
     @whose_ply: either 'p1' or 'p2'; current-ply player to make the move
@@ -271,26 +778,106 @@ def alpha_beta(whose_ply, board, depth, alpha, beta):
     @depth: the number of plys to search down the tree
     @alpha: the score of node player
     @beta: the score of opponent
+    @tt: optional TranspositionTable; needs a BitBoard board
+    @budget: optional SearchBudget; SearchTimeout is raised when it runs out
+    @ordering: optional MoveOrdering; killer and history move ordering
+    @evaluate: the leaf evaluation function; same signature as hef, e.g.
+	       one of EVALUATORS
+    @stats: optional SearchStats; collects the statistics of the search
+    @pvs: search as a Principal Variation Search
     @return: an integer score
     '''
 
+    if budget is not None:
+	budget.nodes += 1
+	if budget.nodes >= budget.next_check: budget.check()
+    if stats is not None: stats.enter(depth)
+
     # return a score computed by a quiescence search
     # need to check if terminal too!
-    if depth == 0: return hef(whose_ply, board)
+    if depth == 0:
+	if stats is not None: stats.leaves += 1
+	return evaluate(whose_ply, board)
+
+    # look the position up in the transposition table first
+    tt_move = None
+    if tt is not None:
+	key, sym = _tt_key(whose_ply, board, depth)
+	entry = tt.probe(key)
+	if entry is not None:
+	    tt_move = _from_tt(board, entry[4], sym)
+	    if entry[1] >= depth:
+		flag, score = entry[2], entry[3]
+		if flag != UPPER and score >= beta: return beta
+		if flag != LOWER and score <= alpha: return alpha
+		if flag == EXACT: return score
+
+    # positions with few empty tiles left to the pawns are known exactly;
+    # scored like the won and lost leaves of hef, which know no distance
+    # to the end of the game either
+    if _tablebase is not None and depth > 1:
+	known = _tablebase.probe(whose_ply, board)
+	if known is not None:
+	    if stats is not None: stats.tablebase_hits += 1
+	    return beta if known[0] else alpha
 
     # otherwise calculate alpha and beta score for next ply
-    pos = board.get_position(whose_ply)
     next_ply_player = 'p1' if whose_ply=='p2' else 'p2'
+    alpha_orig, best_move = alpha, None
+    if ordering is not None: pos = board.get_position(whose_ply)
+
+    # the children of a frontier node are leaves; they are evaluated
+    # straight from the ray tables (see _child_score) instead of making and
+    # unmaking every move, and only until a beta-cutoff; if the evaluation
+    # function has a frontier version
+    frontier = depth == 1 and isinstance(board, BitBoard) and _child_scores.get(evaluate)
+    if frontier:
+	pos_oppt = board.get_position(next_ply_player)
+	n, bits, rays, occupied = board.n, board.bits, board.rays, board.occupied
+	rays_oppt = rays[pos_oppt[0]*n + pos_oppt[1]]
     
-    for move in _get_next_moves(whose_ply, pos, board.get_board(), 0, 7):
-	_make_move(board, whose_ply, move)   # make move
-	score = -alpha_beta(next_ply_player, board, depth-1, -beta, -alpha)
-	_unmake_move(board, whose_ply, move) # unmake move
-	if score >= beta: return beta 	 # beta-cutoff
-	if score > alpha: alpha = score  # max's player's score
+    # the moves come one at a time, so a cutoff by the table's move or a
+    # killer saves generating and sorting the others
+    first = True
+    for move in _staged_moves(whose_ply, board, depth, tt_move, ordering):
+	if frontier:
+	    if budget is not None:
+		budget.nodes += 1
+		if budget.nodes >= budget.next_check: budget.check()
+	    if stats is not None:
+		stats.enter(0)
+		stats.leaves += 1
+	    score = frontier(move, n, bits, rays, rays_oppt, occupied)
+	elif pvs and not first:
+	    _make_move(board, whose_ply, move)   # make move
+	    score = -alpha_beta(next_ply_player, board, depth-1, -alpha-NULL_WINDOW, -alpha,
+				tt, budget, ordering, evaluate, stats, pvs)
+	    if alpha < score < beta:             # better after all; search again
+		score = -alpha_beta(next_ply_player, board, depth-1, -beta, -alpha, tt, budget,
+				    ordering, evaluate, stats, pvs)
+	    _unmake_move(board, whose_ply, move) # unmake move
+	else:
+	    _make_move(board, whose_ply, move)   # make move
+	    score = -alpha_beta(next_ply_player, board, depth-1, -beta, -alpha, tt, budget,
+				ordering, evaluate, stats, pvs)
+	    _unmake_move(board, whose_ply, move) # unmake move
+	if score >= beta:                # beta-cutoff
+	    if tt is not None: tt.store(key, depth, LOWER, beta, _to_tt(board, move, sym))
+	    if ordering is not None: ordering.cutoff(pos, move, depth)
+	    if stats is not None: stats.cutoff(first)
+	    return beta
+	if score > alpha:
+	    alpha, best_move = score, move  # max's player's score
+	    if stats is not None: stats.improve(depth, move)
+	first = False
+
+    if tt is not None:
+	if alpha > alpha_orig: tt.store(key, depth, EXACT, alpha, _to_tt(board, best_move, sym))
+	else:                  tt.store(key, depth, UPPER, alpha, _to_tt(board, tt_move, sym))
     return alpha
 
-def alpha_beta_root(whose_ply, board, depth, alpha, beta):
+def alpha_beta_root(whose_ply, board, depth, alpha, beta, tt=None, budget=None,
+		    first_move=None, ordering=None, evaluate=hef, stats=None):
     '''Alpha-Beta algorithm root function. It calls a recursive
     function 'alpha_beta(node, dept, alpha, beta)'
     
@@ -300,16 +887,187 @@ def alpha_beta_root(whose_ply, board, depth, alpha, beta):
     @depth: the number of plys to search down the tree
     @alpha: the score of node player
     @beta: the score of opponent
+    @tt: optional TranspositionTable; needs a BitBoard board
+    @budget: optional SearchBudget; SearchTimeout is raised when it runs out
+    @first_move: optional move to search first, ahead of the table's move
+    @ordering: optional MoveOrdering; killer and history move ordering
+    @evaluate: the leaf evaluation function; same signature as hef
+    @stats: optional SearchStats; collects the statistics of the search
     @return: the best move so far 
     '''
+
+    # once the pawns cannot reach each other any more, the endgame solver
+    # plays perfectly; it keeps moving even when the game is lost
+    solved = endgame.solve(whose_ply, board)
+    if solved is not None:
+	if stats is not None: stats.solved = True
+	return solved[1]
+
+    return _search_root(whose_ply, board, depth, alpha, beta, tt, budget, first_move,
+			ordering, evaluate, stats)[0]
+
+def _search_root(whose_ply, board, depth, alpha, beta, tt=None, budget=None,
+		 first_move=None, ordering=None, evaluate=hef, stats=None, pvs=False):
+    '''Search the root node; the body of alpha_beta_root and pvs_root.
+    Takes the arguments of alpha_beta, plus 'first_move' (see
+    alpha_beta_root), and returns a tuple (best move, score). The best
+    move is None if no move scores above alpha; a score of beta means the
+    search failed high on the move returned.'''
+
+    if stats is not None:
+	stats.new_iteration(depth)
+	stats.nodes[0] += 1
     
     # calculate the best move for next ply
-    best_move, pos = None, board.get_position(whose_ply)
+    best_move, tt_move = None, None
     next_ply_player = 'p1' if whose_ply=='p2' else 'p2'
+    if tt is not None:
+	key = board.get_hash(whose_ply)
+	entry = tt.probe(key)
+	if entry is not None: tt_move = entry[4]
+    if first_move is not None: tt_move = first_move
+    move_table = _next_moves(whose_ply, board)
+    if ordering is not None:
+	ordering.new_search()
+	move_table = ordering.order(board.get_position(whose_ply), move_table, depth)
+    
+    move_table = _tt_first(move_table, tt_move)
     
-    for move in _get_next_moves(whose_ply, pos, board.get_board(), 0, 7):
+    for move in move_table:
+	if stats is not None: start = time.time()
 	_make_move(board, whose_ply, move)   # make move
-	score = -alpha_beta(next_ply_player, board, depth-1, -beta, -alpha)
+	if pvs and move != move_table[0]:
+	    score = -alpha_beta(next_ply_player, board, depth-1, -alpha-NULL_WINDOW, -alpha,
+				tt, budget, ordering, evaluate, stats, pvs)
+	    if alpha < score < beta:
+		score = -alpha_beta(next_ply_player, board, depth-1, -beta, -alpha, tt, budget,
+				    ordering, evaluate, stats, pvs)
+	else:
+	    score = -alpha_beta(next_ply_player, board, depth-1, -beta, -alpha, tt, budget,
+				ordering, evaluate, stats, pvs)
 	_unmake_move(board, whose_ply, move) # unmake move
-	if score > alpha: alpha, best_move = score, move
+	if stats is not None: stats.root_moves.append((move, score, time.time() - start))
+	if score >= beta:                    # fails high; the caller widens the window
+	    if tt is not None: tt.store(key, depth, LOWER, beta, move)
+	    if stats is not None: stats.end_iteration(move, beta)
+	    return move, beta
+	if score > alpha:
+	    alpha, best_move = score, move
+	    if stats is not None: stats.improve(depth, move)
+
+    if tt is not None and best_move is not None:
+	tt.store(key, depth, EXACT, alpha, best_move)
+    if stats is not None: stats.end_iteration(best_move, alpha)
+    return best_move, alpha
+
+def pvs_root(whose_ply, board, depth, alpha, beta, tt=None, budget=None, first_move=None,
+	     ordering=None, evaluate=hef, stats=None, guess=None, window=ASPIRATION_WINDOW):
+    '''Principal Variation Search root function; a drop-in replacement for
+    alpha_beta_root choosing the same move, usually with fewer nodes.
+
+    The root is searched with an aspiration window around an expected
+    score: 'guess' if given, or else the exact score the table holds for
+    the position, e.g. one found while searching the previous move. The
+    scores of hef swing from one side to the other with the parity of the
+    depth, so only a score from a search of the same parity serves as the
+    guess. If the score falls outside the window, the search is repeated
+    with the window widened fourfold on that side, up to the full window.
+
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+    @board: Board object reference; the initial board state to be searched
+    @depth: the number of plys to search down the tree
+    @alpha: the score of node player
+    @beta: the score of opponent
+    @tt: optional TranspositionTable; needs a BitBoard board
+    @budget: optional SearchBudget; SearchTimeout is raised when it runs out
+    @first_move: optional move to search first, ahead of the table's move
+    @ordering: optional MoveOrdering; killer and history move ordering
+    @evaluate: the leaf evaluation function; same signature as hef
+    @stats: optional SearchStats; collects the statistics of the search
+    @guess: the expected score, or None to look it up in the table
+    @window: the initial half-width of the aspiration window; None: off
+    @return: the best move so far
+    '''
+
+    solved = endgame.solve(whose_ply, board)
+    if solved is not None:
+	if stats is not None: stats.solved = True
+	return solved[1]
+
+    if guess is None and tt is not None:
+	entry = tt.probe(board.get_hash(whose_ply))
+	if entry is not None and entry[2] == EXACT and entry[1] % 2 == depth % 2 and \
+	   NEG_INFINITY < entry[3] < POS_INFINITY:
+	    guess = entry[3]
+    if guess is None or not window:
+	return _search_root(whose_ply, board, depth, alpha, beta, tt, budget, first_move,
+			    ordering, evaluate, stats, True)[0]
+
+    below = above = window
+    while True:
+	low, high = max(alpha, guess - below), min(beta, guess + above)
+	move, score = _search_root(whose_ply, board, depth, low, high, tt, budget, first_move,
+				   ordering, evaluate, stats, True)
+	if score <= low and low > alpha:     # fails low
+	    below *= 4
+	elif score >= high and high < beta:  # fails high
+	    above *= 4
+	    first_move = move
+	else:
+	    return move
+
+def iterative_deepening(whose_ply, board, time_limit, max_nodes=None, max_depth=None,
+			tt=None, ordering=None, evaluate=hef, budget=None, stats=None,
+			root=None):
+    '''Iterative deepening driver around alpha_beta_root. It searches to depth
+    1, 2, 3, ... until the budget runs out, trying the best move of each
+    iteration first in the next one.
+
+    The search runs on a BitBoard copy of 'board', so an iteration cut
+    short by the budget leaves 'board' untouched.
+
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+    @board: Board or BitBoard object reference; the board state to be searched
+    @time_limit: the wall-clock budget in seconds, or None
+    @max_nodes: the maximum number of nodes to visit, or None
+    @max_depth: the deepest iteration to run; defaults to the number of
+		empty tiles, beyond which deeper searches change nothing
+    @tt: optional TranspositionTable
+    @ordering: optional MoveOrdering
+    @evaluate: the leaf evaluation function; same signature as hef
+    @budget: optional SearchBudget to use instead of time_limit/max_nodes,
+	     e.g. to read the number of nodes searched afterwards
+    @stats: optional SearchStats; gets one record per completed iteration
+    @root: the root search function, alpha_beta_root (the default) or
+	   pvs_root; pvs_root centres its aspiration window on the score of
+	   the iteration two plies shallower, which needs a table
+    @return: the best move of the deepest fully completed iteration
+    '''
+
+    if isinstance(board, BitBoard): board = board.copy()
+    else:                           board = BitBoard.from_board(board)
+
+    moves = _next_moves(whose_ply, board)
+    if len(moves) <= 1: return moves[0] if moves else None
+
+    empty = board.n*board.n - bin(board.occupied).count('1')
+    max_depth = min(max_depth, empty) if max_depth else empty
+    budget = budget or SearchBudget(time_limit, max_nodes)
+    root = root or alpha_beta_root
+
+    best_move, scores = moves[0], {}
+    for depth in xrange(1, max_depth+1):
+	extra = {'guess': scores.get(depth-2)} if root is pvs_root else {}
+	try:
+	    move = root(whose_ply, board, depth, NEG_INFINITY, POS_INFINITY, tt, budget,
+			best_move, ordering, evaluate, stats, **extra)
+	except SearchTimeout:
+	    break
+	best_move = move
+	if move is None: break   # every move loses
+	if extra and tt is not None:
+	    entry = tt.probe(board.get_hash(whose_ply))
+	    if entry is not None and entry[2] == EXACT: scores[depth] = entry[3]
     return best_move
@@ -0,0 +1,245 @@
+#!/usr/bin/python
+
+"""Module analyze
+Bulk position analysis for Game Isolation: searches every position of a
+position file on a pool of worker processes, and writes one JSON line of
+results per position, in input order.
+
+Positions are read one line at a time, from a file or stdin. A line is a
+JSON object, or just the list of moves:
+
+    {"moves": [[4, 4], [5, 5]], "size": 8, "first": "p1", "id": "any"}
+    [[4, 4], [5, 5], [3, 4]]
+
+The moves are played from the start position, 'first' (p1 by default)
+moving first, and the position is analysed for the player to move next.
+Blank lines and lines starting with '#' are skipped. Alternatively, with
+--records, every position of every game in a binary game record file is
+analysed (see module record).
+
+Each result line holds the input line number (or game and ply), the id
+if given, the player to move, the best move, its score, the depth
+reached, the nodes searched and the seconds taken; or an error message.
+Results are written as soon as all positions before them are done. At
+most a fixed number of positions per worker is in flight at any time, so
+memory use does not grow with the size of the input.
+
+Usage: python analyze.py [-d DEPTH | -t SECONDS] [-j PROCESSES] [--records] [FILE]
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: analyze.py
+
+"""
+
+import sys
+import json
+import errno
+import time
+import argparse
+import itertools
+import threading
+import multiprocessing
+
+from bitboard import BitBoard
+from ttable import TranspositionTable
+from record import read_records, replay
+from moves import is_legal
+from algo import *
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# the default search depth
+DEPTH = 6
+
+# positions in flight per worker process, running or waiting to be written
+WINDOW_PER_WORKER = 4
+
+# the transposition table of a worker; cleared for every position
+TT_ENTRIES = 1 << 18
+
+#=====================================================================#
+#                         Worker Processes                            #
+#=====================================================================#
+
+# the transposition table of a worker, set by _init_worker
+_tt = None
+
+def _init_worker():
+    "Pool initializer: give the worker a transposition table of its own."
+    global _tt
+    _tt = TranspositionTable(TT_ENTRIES)
+
+def _parse(line):
+    '''Set up the position of a position line.
+
+    @line: the line, a JSON object or list of moves
+    @return: a tuple (whose_ply, board, id or None)
+    @raise: ValueError if the line is not a valid position
+    '''
+
+    position = json.loads(line)
+    if isinstance(position, list): position = {'moves': position}
+    if not isinstance(position, dict): raise ValueError('not a position')
+    board = BitBoard(int(position.get('size', 8)))
+    who = position.get('first', 'p1')
+    if who not in ('p1', 'p2'): raise ValueError('bad first player: %s' % who)
+
+    for move in position.get('moves', []):
+	move = tuple(int(x) for x in move)
+	if not is_legal(who, board, move):
+	    raise ValueError('illegal move: %s' % (move,))
+	board.set_move(move, who)
+	who = 'p1' if who == 'p2' else 'p2'
+    return who, board, position.get('id')
+
+def _analyze(task):
+    '''Analyse one position; run in a worker process.
+
+    @task: a tuple (fields, line or None, whose_ply, board, depth, time_limit):
+	   'fields' go into the result as they are; the position is parsed
+	   from 'line' if given, else it is whose_ply and board
+    @return: the result, a dictionary
+    '''
+
+    result, line, who, board, depth, time_limit = task
+    try:
+	if line is not None:
+	    who, board, pid = _parse(line)
+	    if pid is not None: result['id'] = pid
+
+	_tt.clear()
+	stats, budget = SearchStats(), SearchBudget()
+	start = time.time()
+	if time_limit:
+	    move = iterative_deepening(who, board, time_limit, max_depth=depth, tt=_tt,
+				       ordering=MoveOrdering(), stats=stats)
+	else:
+	    move = alpha_beta_root(who, board, depth, NEG_INFINITY, POS_INFINITY, _tt,
+				   budget, ordering=MoveOrdering(), stats=stats)
+	seconds = time.time() - start
+
+	last = stats.iterations[-1] if stats.iterations else None
+	result.update({'who': who, 'move': move, 'score': last and last['score'],
+		       'depth': last and last['depth'], 'solved': stats.solved,
+		       'nodes': sum(it['nodes'] for it in stats.iterations),
+		       'seconds': round(seconds, 6)})
+    except Exception, e:
+	result['error'] = '%s: %s' % (e.__class__.__name__, e)
+    return result
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+def position_tasks(lines, depth=DEPTH, time_limit=None):
+    '''Generate the analysis tasks of the lines of a position file.
+
+    --- Function Arguments ---
+    @lines: an iterable of position lines, e.g. an open file
+    @depth: the search depth; the deepest iteration with a time limit
+    @time_limit: seconds per position; searches with iterative deepening
+    @return: a generator of tasks for analyze
+    '''
+
+    for number, line in enumerate(lines, 1):
+	line = line.strip()
+	if not line or line.startswith('#'): continue
+	yield {'line': number}, line, None, None, depth, time_limit
+
+def record_tasks(f, depth=DEPTH, time_limit=None):
+    '''Generate the analysis tasks of every position of a game record file.
+
+    --- Function Arguments ---
+    @f: a game record file opened for binary reading
+    @depth: the search depth; the deepest iteration with a time limit
+    @time_limit: seconds per position; searches with iterative deepening
+    @return: a generator of tasks for analyze
+    '''
+
+    ply, previous = 0, None
+    for game, board, who, move, stats in replay(read_records(f)):
+	ply = ply + 1 if game == previous else 0
+	previous = game
+	yield {'game': game, 'ply': ply, 'played': move}, None, who, board.copy(), \
+	      depth, time_limit
+
+def analyze(tasks, processes=None, window=None):
+    '''Analyse positions on a pool of worker processes.
+
+    The tasks are taken from their iterator only as room in the window
+    frees up, so neither the tasks nor the results pile up in memory.
+
+    --- Function Arguments ---
+    @tasks: an iterable of tasks, from position_tasks or record_tasks
+    @processes: the number of worker processes; defaults to the number of
+		CPUs; 1 analyses in this process
+    @window: positions in flight at most; defaults to WINDOW_PER_WORKER
+	     per worker
+    @return: a generator of the results, in the order of the tasks
+    '''
+
+    processes = processes or multiprocessing.cpu_count()
+    if processes == 1:
+	_init_worker()
+	for result in itertools.imap(_analyze, tasks): yield result
+	return
+
+    # the pool takes the tasks in a thread of its own, which waits here
+    # for a free slot
+    slots, stopping = threading.Semaphore(window or processes*WINDOW_PER_WORKER), \
+		      threading.Event()
+    def throttled():
+	for task in tasks:
+	    slots.acquire()
+	    if stopping.is_set(): return
+	    yield task
+
+    pool = multiprocessing.Pool(processes, _init_worker)
+    try:
+	for result in pool.imap(_analyze, throttled()):
+	    slots.release()
+	    yield result
+    finally:
+	# let the task thread finish, or terminate() waits for it forever
+	stopping.set()
+	slots.release()
+	pool.terminate()
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyse Isolation positions in bulk.')
+    parser.add_argument('path', nargs='?', default='-',
+			help='position file, or - for stdin (the default)')
+    parser.add_argument('-d', '--depth', type=int, default=None,
+			help='search depth (default %d); with --time, the deepest iteration'
+			% DEPTH)
+    parser.add_argument('-t', '--time', type=float, default=None,
+			help='seconds per position; searches with iterative deepening')
+    parser.add_argument('-j', '--processes', type=int, default=None,
+			help='worker processes (default: number of CPUs)')
+    parser.add_argument('--records', action='store_true',
+			help='read a binary game record file and analyse all its positions')
+    args = parser.parse_args()
+
+    depth = args.depth or (None if args.time else DEPTH)
+    if args.records:
+	f = open(args.path, 'rb') if args.path != '-' else sys.stdin
+	tasks = record_tasks(f, depth, args.time)
+    else:
+	f = open(args.path) if args.path != '-' else sys.stdin
+	tasks = position_tasks(iter(f.readline, ''), depth, args.time)
+
+    try:
+	for result in analyze(tasks, args.processes):
+	    sys.stdout.write(json.dumps(result) + '\n')
+	    sys.stdout.flush()
+    except KeyboardInterrupt:
+	pass
+    except IOError, e:
+	if e.errno != errno.EPIPE: raise   # the reader went away, e.g. head
+    finally:
+	f.close()
+
+if __name__ == '__main__': main()
@@ -0,0 +1,338 @@
+#!/usr/bin/python
+
+"""Module bench
+Benchmark suite for Game Isolation, measuring the hot paths of the engine
+on a fixed set of positions:
+
+    perft    the number of leaf nodes of the full move tree to a fixed
+	     depth, walked with _get_next_moves on a Board and with the
+	     bitboard move generator on a BitBoard
+    search   fixed-depth alpha_beta_root runs on opening, middlegame and
+	     endgame positions: nodes, seconds and nodes/sec
+    hef      evaluations per second of hef on its own
+    sizes    fixed-depth searches on 8x8, 12x12 and 16x16 boards, from
+	     positions a few random plies into the game: nodes/sec across
+	     board sizes
+
+The results are written as JSON. Saved as a baseline (--save), they can be
+compared with later runs (--baseline): node and leaf counts must match
+exactly, or the run fails with exit status 1. Timings depend on the
+machine the baseline was saved on, so timings slower than the baseline
+by more than --tolerance are only reported; with --strict-timing they
+fail the run too.
+
+Usage: python bench.py [--quick] [--repeat N] [--save FILE] [--baseline FILE]
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: bench.py
+
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+
+from board import Board
+from bitboard import BitBoard
+from ttable import TranspositionTable
+from algo import *
+from algo import _get_next_moves, _next_moves
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# benchmark positions, as the moves played from the start position
+# (p1 first); each set is searched to the depth given with it
+POSITIONS = {
+    'opening': (6, [
+	[],
+	[(4, 4), (5, 5), (1, 7)],
+	[(4, 4), (5, 5), (3, 4), (5, 1), (3, 1)],
+	[(4, 4), (5, 5), (3, 4), (6, 5), (2, 3), (6, 3)],
+    ]),
+    'middlegame': (8, [
+	[(4, 4), (5, 5), (3, 4), (5, 1), (3, 1), (2, 4), (3, 2), (1, 3), (4, 3), (1, 6),
+	 (6, 3), (3, 6), (7, 4), (0, 3)],
+	[(4, 4), (5, 5), (1, 7), (1, 5), (6, 7), (3, 3), (4, 5), (4, 3), (1, 2), (7, 6),
+	 (2, 1), (4, 6), (3, 1), (3, 6), (4, 1)],
+	[(4, 4), (5, 5), (3, 4), (5, 1), (3, 2), (3, 3), (7, 6), (6, 3), (3, 6), (5, 2),
+	 (4, 5), (7, 0), (5, 6), (2, 0), (7, 4)],
+	[(4, 4), (5, 5), (3, 4), (6, 5), (2, 3), (6, 3), (3, 2), (7, 2), (4, 2), (7, 0),
+	 (1, 5), (4, 0), (1, 1), (2, 2), (5, 1), (1, 2), (5, 2)],
+    ]),
+    'endgame': (12, [
+	[(4, 4), (5, 5), (3, 4), (5, 1), (3, 2), (3, 3), (7, 6), (6, 3), (3, 6), (5, 2),
+	 (4, 5), (7, 0), (5, 6), (2, 0), (7, 4), (2, 7), (6, 5), (2, 2), (6, 4), (1, 3),
+	 (3, 1), (0, 3), (4, 1), (2, 5), (5, 0), (0, 7), (3, 0), (0, 4)],
+	[(6, 6), (4, 7), (4, 4), (2, 5), (3, 4), (2, 3), (5, 2), (5, 3), (0, 2), (3, 1),
+	 (0, 6), (1, 3), (6, 0), (4, 6), (6, 4), (4, 5), (5, 4), (2, 7), (2, 1), (2, 6),
+	 (3, 2), (1, 6), (3, 3), (1, 4), (5, 1), (1, 5), (4, 1), (0, 5)],
+	[(4, 4), (5, 5), (3, 4), (3, 7), (2, 4), (3, 6), (2, 1), (3, 5), (3, 2), (5, 7),
+	 (3, 3), (6, 6), (6, 3), (7, 5), (5, 2), (2, 0), (5, 1), (3, 1), (6, 1), (2, 2),
+	 (6, 2), (2, 3), (7, 3), (1, 3), (6, 4), (0, 4), (7, 4), (0, 5), (6, 5), (0, 6)],
+	[(4, 4), (5, 5), (3, 4), (6, 5), (2, 3), (6, 3), (3, 2), (7, 2), (4, 2), (7, 0),
+	 (1, 5), (4, 0), (1, 1), (2, 2), (5, 1), (1, 2), (5, 2), (0, 2), (5, 3), (4, 6),
+	 (7, 5), (4, 7), (6, 6), (3, 6), (6, 7), (0, 6), (4, 5), (2, 6), (2, 5), (2, 7),
+	 (2, 4), (1, 7)],
+    ]),
+}
+
+# board lengths searched by bench_sizes, each to the depth given with it,
+# and the number of positions per board length
+SIZES = {8: 6, 12: 5, 16: 4}
+SIZE_POSITIONS = 4
+
+# the perft depth, and the number of hef calls timed per position
+PERFT_DEPTH = 4
+HEF_CALLS = 20000
+
+# how much slower than the baseline a timing may be before it is reported
+TOLERANCE = 0.10
+
+#=====================================================================#
+#                         Private Functions                           #
+#=====================================================================#
+
+def _setup(board, moves):
+    "Play 'moves' on board from the start position; return the player to move."
+
+    board.clear_board()
+    who = 'p1'
+    for move in moves:
+	board.set_move(tuple(move), who)
+	who = 'p1' if who == 'p2' else 'p2'
+    return who
+
+def _perft_board(who, board, depth):
+    "Count the leaves of the move tree of a Board with _get_next_moves."
+
+    if depth == 0: return 1
+    moves = _get_next_moves(who, board.get_position(who), board.get_board(), 0, board.size)
+    other = 'p1' if who == 'p2' else 'p2'
+    leaves = 0
+    for move in moves:
+	board.set_move(move, who)
+	leaves += _perft_board(other, board, depth-1)
+	board.delete_move(move, who)
+    return leaves
+
+def _perft_bitboard(who, board, depth):
+    "Count the leaves of the move tree of a BitBoard."
+
+    if depth == 0: return 1
+    other = 'p1' if who == 'p2' else 'p2'
+    leaves = 0
+    for move in _next_moves(who, board):
+	board.set_move(move, who)
+	leaves += _perft_bitboard(other, board, depth-1)
+	board.delete_move(move, who)
+    return leaves
+
+def _random_position(size, plies, seed):
+    "Return (who, board): a BitBoard 'plies' random plies into a game."
+
+    rng, board, who = random.Random(seed), BitBoard(size), 'p1'
+    for ply in xrange(plies):
+	moves = _next_moves(who, board)
+	if not moves: break
+	board.set_move(rng.choice(moves), who)
+	who = 'p1' if who == 'p2' else 'p2'
+    return who, board
+
+def _best_time(func, repeat):
+    "Run func 'repeat' times; return (its last result, the fastest time)."
+
+    best = None
+    for i in xrange(repeat):
+	start = time.time()
+	result = func()
+	elapsed = time.time() - start
+	if best is None or elapsed < best: best = elapsed
+    return result, best
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+def bench_perft(depth=PERFT_DEPTH, repeat=1):
+    '''Count the move trees of the opening and middlegame positions.
+
+    @depth: the number of plies to walk
+    @repeat: runs per measurement; the fastest one counts
+    @return: a dictionary {'board': {...}, 'bitboard': {...}} holding the
+	     leaf count, seconds and leaves/sec of each walker
+    '''
+
+    positions = POSITIONS['opening'][1] + POSITIONS['middlegame'][1]
+    results = {}
+    for name, board, perft in (('board', Board(), _perft_board),
+			       ('bitboard', BitBoard(), _perft_bitboard)):
+	def run():
+	    return sum(perft(_setup(board, moves), board, depth) for moves in positions)
+	leaves, seconds = _best_time(run, repeat)
+	results[name] = {'leaves': leaves, 'seconds': seconds, 'leaves_per_sec': leaves / seconds}
+    return results
+
+def bench_search(depth=None, repeat=1):
+    '''Search every position set with alpha_beta_root to a fixed depth,
+    with a transposition table and move ordering as Game uses them.
+
+    @depth: overrides the depth of every set
+    @repeat: runs per measurement; the fastest one counts
+    @return: a dictionary {set name: {'depth', 'nodes', 'seconds', 'nodes_per_sec'}}
+    '''
+
+    results = {}
+    for name, (set_depth, positions) in sorted(POSITIONS.items()):
+	search_depth = depth or set_depth
+	def run():
+	    nodes = 0
+	    for moves in positions:
+		board = BitBoard()
+		who = _setup(board, moves)
+		budget = SearchBudget()
+		alpha_beta_root(who, board, search_depth, NEG_INFINITY, POS_INFINITY,
+				TranspositionTable(1 << 16), budget, ordering=MoveOrdering())
+		nodes += budget.nodes
+	    return nodes
+	nodes, seconds = _best_time(run, repeat)
+	results[name] = {'depth': search_depth, 'nodes': nodes, 'seconds': seconds,
+			 'nodes_per_sec': nodes / seconds}
+    return results
+
+def bench_hef(calls=HEF_CALLS, repeat=1):
+    '''Time hef on its own, on every position of every set.
+
+    @calls: the number of calls per position
+    @repeat: runs per measurement; the fastest one counts
+    @return: a dictionary {'calls', 'seconds', 'calls_per_sec'}
+    '''
+
+    boards = []
+    for set_depth, positions in POSITIONS.values():
+	for moves in positions:
+	    board = BitBoard()
+	    boards.append((_setup(board, moves), board))
+
+    def run():
+	for who, board in boards:
+	    for i in xrange(calls): hef(who, board)
+	return calls * len(boards)
+    total, seconds = _best_time(run, repeat)
+    return {'calls': total, 'seconds': seconds, 'calls_per_sec': total / seconds}
+
+def bench_sizes(sizes=None, depth=None, repeat=1):
+    '''Search positions on boards of several sizes to a fixed depth, with
+    a transposition table and move ordering as Game uses them. The
+    positions are 'size' random plies into a game, the same on every run.
+
+    @sizes: a dictionary {board length: depth}; defaults to SIZES
+    @depth: overrides the depth of every size
+    @repeat: runs per measurement; the fastest one counts
+    @return: a dictionary {board length (a string): {'depth', 'nodes',
+	     'seconds', 'nodes_per_sec'}}
+    '''
+
+    results = {}
+    for size, size_depth in sorted((sizes or SIZES).items()):
+	search_depth = depth or size_depth
+	def run():
+	    nodes = 0
+	    for seed in xrange(SIZE_POSITIONS):
+		who, board = _random_position(size, size, seed)
+		budget = SearchBudget()
+		alpha_beta_root(who, board, search_depth, NEG_INFINITY, POS_INFINITY,
+				TranspositionTable(1 << 16), budget, ordering=MoveOrdering())
+		nodes += budget.nodes
+	    return nodes
+	nodes, seconds = _best_time(run, repeat)
+	results[str(size)] = {'depth': search_depth, 'nodes': nodes, 'seconds': seconds,
+			      'nodes_per_sec': nodes / seconds}
+    return results
+
+def run_all(quick=False, repeat=1):
+    '''Run the whole suite.
+
+    @quick: use shallow searches, for a fast sanity check
+    @repeat: runs per measurement; the fastest one counts
+    @return: the results, ready to be dumped as JSON
+    '''
+
+    return {'perft': bench_perft(PERFT_DEPTH-1 if quick else PERFT_DEPTH, repeat),
+	    'search': bench_search(4 if quick else None, repeat),
+	    'hef': bench_hef(HEF_CALLS // 10 if quick else HEF_CALLS, repeat),
+	    'sizes': bench_sizes(None, 3 if quick else None, repeat)}
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    '''Compare results with a baseline of the same suite.
+
+    --- Function Arguments ---
+    @results: the results of run_all
+    @baseline: earlier results of run_all, e.g. loaded from a file
+    @tolerance: the fraction by which a timing may exceed the baseline
+    @return: a tuple (changed counts, slower timings) of lists of strings;
+	     both empty if nothing changed
+    '''
+
+    problems, slowdowns = [], []
+    def check(name, new, old):
+	for key in ('leaves', 'nodes', 'calls', 'depth'):
+	    if key in old and new.get(key) != old[key]:
+		problems.append('%s: %s changed from %s to %s' % (name, key, old[key], new.get(key)))
+	if 'seconds' in old and old.get('depth') == new.get('depth'):
+	    ratio = new['seconds'] / old['seconds'] if old['seconds'] else 1.0
+	    if ratio > 1 + tolerance:
+		slowdowns.append('%s: %.0f%% slower (%.3fs, was %.3fs)'
+				 % (name, 100*(ratio-1), new['seconds'], old['seconds']))
+
+    for name in sorted(results['perft']):
+	if name in baseline.get('perft', {}):
+	    check('perft/' + name, results['perft'][name], baseline['perft'][name])
+    for name in sorted(results['search']):
+	if name in baseline.get('search', {}):
+	    check('search/' + name, results['search'][name], baseline['search'][name])
+    for name in sorted(results['sizes']):
+	if name in baseline.get('sizes', {}):
+	    check('sizes/' + name, results['sizes'][name], baseline['sizes'][name])
+    if 'hef' in baseline: check('hef', results['hef'], baseline['hef'])
+    return problems, slowdowns
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Isolation engine.')
+    parser.add_argument('--quick', action='store_true', help='shallow searches only')
+    parser.add_argument('--repeat', type=int, default=1,
+			help='runs per measurement; the fastest one counts')
+    parser.add_argument('--save', metavar='FILE', help='save the results as a baseline')
+    parser.add_argument('--baseline', metavar='FILE', help='compare with a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+			help='slowdown against the baseline reported (default 0.10)')
+    parser.add_argument('--strict-timing', action='store_true',
+			help='fail on timings slower than the tolerance, not just report them')
+    args = parser.parse_args()
+
+    results = run_all(args.quick, args.repeat)
+    print json.dumps(results, indent=2, sort_keys=True)
+    if args.save:
+	f = open(args.save, 'w')
+	try:
+	    json.dump(results, f, indent=2, sort_keys=True)
+	finally:
+	    f.close()
+
+    if args.baseline:
+	f = open(args.baseline)
+	try:
+	    problems, slowdowns = compare(results, json.load(f), args.tolerance)
+	finally:
+	    f.close()
+	for problem in problems: print >> sys.stderr, problem
+	for slowdown in slowdowns: print >> sys.stderr, 'timing:', slowdown
+	if args.strict_timing: problems += slowdowns
+	if problems: sys.exit(1)
+	print >> sys.stderr, 'no changed counts against', args.baseline
+
+if __name__ == '__main__': main()
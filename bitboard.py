@@ -0,0 +1,405 @@
+#!/usr/bin/python
+
+"""Module bitboard
+A bitboard representation of a Board object in game Isolation.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: bitboard.py
+
+"""
+
+from array import array
+
+from ttable import zobrist_keys
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# the 8 directions a pawn can move in, in the order the move generator
+# of module algo walks them: N, NE, E, SE, S, SW, W, NW
+DIRECTIONS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+# precomputed tables, one entry per board size
+_tables = {}
+
+# symmetry permutations of the squares, one entry per board size
+_symmetries = {}
+
+# tables mapping whole masks through the symmetries, one entry per board size
+_images = {}
+
+# markers in BitBoard.prev for an empty tile and a pawn's starting tile
+EMPTY = -1
+START = -2
+
+class _RayMoves(dict):
+    '''Map the occupied squares on one ray to the moves left on that ray,
+    nearest first. Entries are filled in on first use.'''
+
+    def __init__(self, squares):
+	dict.__init__(self)
+	self.squares = squares   # (bit, tile) pairs, nearest first
+
+    def __missing__(self, blockers):
+	moves = []
+	for bit, tile in self.squares:
+	    if bit & blockers: break
+	    moves.append(tile)
+	self[blockers] = moves = tuple(moves)
+	return moves
+
+class _RayCounts(dict):
+    '''Map the occupied squares on one ray to the number of moves left on
+    that ray. Entries are filled in on first use.'''
+
+    def __init__(self, moves):
+	dict.__init__(self)
+	self.moves = moves   # the _RayMoves table of the same ray
+
+    def __missing__(self, blockers):
+	self[blockers] = count = len(self.moves[blockers])
+	return count
+
+def _get_tables(size):
+    '''Return the precomputed tables (bits, coords, rays) for
+    a board of length 'size', building them on first use.
+
+    bits[sq]: the mask of square sq
+    coords[sq]: the (row, column) tuple of square sq
+    rays[sq]: 8 (mask, _RayMoves, _RayCounts) triples, one per direction,
+	      where mask holds all squares from sq (exclusive) to the edge
+    '''
+
+    if size not in _tables:
+	squares = xrange(size*size)
+	bits = tuple(1 << sq for sq in squares)
+	coords = tuple((sq // size, sq % size) for sq in squares)
+	rays = []
+	for sq in squares:
+	    triples = []
+	    for dr, dc in DIRECTIONS:
+		ray, i, j = [], coords[sq][0]+dr, coords[sq][1]+dc
+		while 0 <= i < size and 0 <= j < size:
+		    ray.append((bits[i*size+j], coords[i*size+j]))
+		    i, j = i+dr, j+dc
+		moves = _RayMoves(tuple(ray))
+		triples.append((sum(bit for bit, tile in ray), moves, _RayCounts(moves)))
+	    rays.append(tuple(triples))
+	_tables[size] = (bits, coords, tuple(rays))
+    return _tables[size]
+
+def _mobility(rays, occupied):
+    '''Return the number of moves from a square, given its 8 rays (an entry
+    of the rays table) and the occupancy of the board; it takes no board
+    object, so it also evaluates positions that are never set up.'''
+
+    (m0, _, c0), (m1, _, c1), (m2, _, c2), (m3, _, c3), \
+    (m4, _, c4), (m5, _, c5), (m6, _, c6), (m7, _, c7) = rays
+    return (c0[m0 & occupied] + c1[m1 & occupied] + c2[m2 & occupied] + c3[m3 & occupied] +
+	    c4[m4 & occupied] + c5[m5 & occupied] + c6[m6 & occupied] + c7[m7 & occupied])
+
+def _get_symmetries(size):
+    '''Return the 8 symmetries of a board of length 'size' as a tuple
+    (perms, inverses): perms[s][sq] is the square sq is mapped to by
+    symmetry s, and inverses[s] undoes perms[s]. Symmetry 0 is the identity.
+    '''
+
+    if size not in _symmetries:
+	m = size-1
+	maps = (lambda i, j: (i, j),     lambda i, j: (j, m-i),
+		lambda i, j: (m-i, m-j), lambda i, j: (m-j, i),
+		lambda i, j: (i, m-j),   lambda i, j: (m-i, j),
+		lambda i, j: (j, i),     lambda i, j: (m-j, m-i))
+	perms, inverses = [], []
+	for f in maps:
+	    perm = [None] * (size*size)
+	    for sq in xrange(size*size):
+		i, j = f(sq // size, sq % size)
+		perm[sq] = i*size + j
+	    inverse = [None] * (size*size)
+	    for sq, image in enumerate(perm): inverse[image] = sq
+	    perms.append(tuple(perm))
+	    inverses.append(tuple(inverse))
+	_symmetries[size] = (tuple(perms), tuple(inverses))
+    return _symmetries[size]
+
+def _get_images(size):
+    '''Return the tables (images, keys, fixers) mapping a board of length
+    'size' through its 8 symmetries a byte at a time. Chunk c of a mask
+    holds the squares 8c to 8c+7:
+
+    images[s][c][byte]: the mask the squares in 'byte' of chunk c are
+			mapped to by symmetry s
+    keys[s][c][byte]: the XOR of the mined-tile Zobrist keys of that mask
+    fixers[sq]: a mask with bit s set if symmetry s maps square sq onto itself
+    '''
+
+    if size not in _images:
+	perms = _get_symmetries(size)[0]
+	mined = zobrist_keys(size)[0]
+	chunks = (size*size + 7) // 8
+	images, keys = [], []
+	for perm in perms:
+	    image_chunks, key_chunks = [], []
+	    for c in xrange(chunks):
+		squares = [sq for sq in xrange(8*c, 8*c + 8) if sq < size*size]
+		image_table, key_table = [0] * 256, [0] * 256
+		for byte in xrange(1, 256):
+		    for k, sq in enumerate(squares):
+			if byte & (1 << k):
+			    image_table[byte] |= 1 << perm[sq]
+			    key_table[byte] ^= mined[perm[sq]]
+		image_chunks.append(tuple(image_table))
+		key_chunks.append(tuple(key_table))
+	    images.append(tuple(image_chunks))
+	    keys.append(tuple(key_chunks))
+	fixers = tuple(sum(1 << s for s, perm in enumerate(perms) if perm[sq] == sq)
+		       for sq in xrange(size*size))
+	_images[size] = (tuple(images), tuple(keys), fixers)
+    return _images[size]
+
+def fixing_symmetries(size, occupied, p1, p2):
+    '''Return the symmetries, other than the identity, that map a position
+    onto itself: both pawns stay where they are and so does every occupied
+    tile. Such a symmetry maps every move onto an equivalent one.
+
+    --- Function Arguments ---
+    @size: the board length
+    @occupied: the mask of occupied tiles (mined tiles and pawns)
+    @p1: the square of the pawn of player 1
+    @p2: the square of the pawn of player 2
+    @return: a tuple of symmetry indices, usually empty
+    '''
+
+    images, keys, fixers = _get_images(size)
+    candidates = fixers[p1] & fixers[p2] & ~1
+    if not candidates: return ()
+
+    found = []
+    for s in xrange(1, 8):
+	if not candidates & (1 << s): continue
+	table, mask, image, c = images[s], occupied, 0, 0
+	while mask:
+	    image |= table[c][mask & 255]
+	    mask >>= 8
+	    c += 1
+	if image == occupied: found.append(s)
+    return tuple(found)
+
+class BitBoard(object):
+    '''Class BitBoard
+
+    An alternate Board backend for the search. The mined tiles and both
+    pawns are kept as a single integer 'occupied', in which tile (i, j) is
+    bit i*size+j. Together with the per-square ray masks and the tables
+    keyed by the occupied squares on each ray, move generation and mobility
+    counting in module algo become a few bit operations and lookups.
+    BitBoard offers the same interface as class Board.
+
+    A BitBoard is kept small, so that many games can live in one process:
+    the tables are shared by all boards of a size, and the previous pawn
+    position of every tile is a square index in a compact array.
+    '''
+
+    __slots__ = ('size', 'n', 'sym_p1', 'sym_p2', 'bits', 'coords', 'rays',
+		 'zobrist', 'pos_x', 'pos_o', 'prev', 'occupied', 'hash', 'legal')
+
+    # the slots making up the position; the rest are shared tables
+    POSITION = ('size', 'n', 'sym_p1', 'sym_p2', 'pos_x', 'pos_o', 'prev', 'occupied', 'hash')
+
+    def __init__(self, size=8, sym_p1='x', sym_p2='o'):
+	'''
+	@size: the board (a square/grid) length
+	@sym_p1: player 1 symbol
+	@sym_p2: player 2 symbol
+	'''
+
+	self.size = size-1
+	self.n = size
+	self.sym_p1 = sym_p1
+	self.sym_p2 = sym_p2
+	self.bits, self.coords, self.rays = _get_tables(size)
+	self.zobrist = zobrist_keys(size)
+	self.clear_board()
+
+    def __str__(self):
+	"Return human-readable string of BitBoard object"
+
+	w = len(str(self.n-1))   # the width of a column
+	s = '\n' + ' '*(w+1) + ''.join('%-*d ' % (w, i) for i in xrange(self.n)) + '\n'
+	for i in xrange(self.n):
+	    s += '%*d ' % (w, i)
+	    for j in xrange(self.n):
+		if self.occupied & self.bits[i*self.n+j]:
+		    if self.pos_x==(i,j):   tile = self.sym_p1
+		    elif self.pos_o==(i,j): tile = self.sym_p2
+		    else:                   tile = '*'
+		else:                       tile = '-'
+		s += tile.ljust(w) + ' '
+	    s += '\n'
+	return s
+
+    def __getstate__(self):
+	"Pickle the position only; the shared tables are looked up again."
+	return dict((name, getattr(self, name)) for name in self.POSITION)
+
+    def __setstate__(self, state):
+	for name, value in state.items(): setattr(self, name, value)
+	self.bits, self.coords, self.rays = _get_tables(self.n)
+	self.zobrist = zobrist_keys(self.n)
+	self.legal = None
+
+    def set_move(self, move, whose_turn):
+	'''Make the move on board for player whose_turn.
+
+	--- Function Arguments ---
+	@move: the move (a tuple) a player wants to make
+	@whose_turn: either 'p1' or 'p2'
+	'''
+
+	sq = move[0]*self.n + move[1]
+	mined, pawn_p1, pawn_p2, side = self.zobrist
+	self.occupied |= self.bits[sq]
+	self.legal = None   # the legal moves cached by module moves
+	if whose_turn == 'p1':
+	    last = self.pos_x[0]*self.n + self.pos_x[1]
+	    self.hash ^= pawn_p1[last] ^ mined[last] ^ pawn_p1[sq]
+	    self.prev[sq] = last         # memorize last pawn position!
+	    self.pos_x = self.coords[sq] # update position of pawn
+	else:
+	    last = self.pos_o[0]*self.n + self.pos_o[1]
+	    self.hash ^= pawn_p2[last] ^ mined[last] ^ pawn_p2[sq]
+	    self.prev[sq] = last
+	    self.pos_o = self.coords[sq]
+
+    def delete_move(self, move, whose_turn):
+	'''Unmake the move on board for player whose_turn.
+
+	--- Function Arguments ---
+	@move: the move (a tuple) a player wants to unmake
+	@whose_turn: either 'p1' or 'p2'
+	'''
+
+	sq = move[0]*self.n + move[1]
+	self.occupied ^= self.bits[sq]
+	self.legal = None
+	mined, pawn_p1, pawn_p2, side = self.zobrist
+	last = self.prev[sq]
+	if whose_turn == 'p1':
+	    self.hash ^= pawn_p1[sq] ^ mined[last] ^ pawn_p1[last]
+	    self.pos_x = self.coords[last]   # update pawn position to previous one
+	else:
+	    self.hash ^= pawn_p2[sq] ^ mined[last] ^ pawn_p2[last]
+	    self.pos_o = self.coords[last]
+	self.prev[sq] = EMPTY
+
+    def get_position(self, who):
+	"Get the current position of the player (who) on board."
+	return self.pos_x if who == 'p1' else self.pos_o
+
+    def get_hash(self, whose_ply):
+	"Get the Zobrist hash of the position with player whose_ply to move."
+	return self.hash ^ self.zobrist[3] if whose_ply == 'p2' else self.hash
+
+    def get_board(self):
+	'''Get a 2D array in the layout of Board.get_board(), built on demand.
+	Meant for the UI and move validation, not for the search.'''
+
+	tiles = [None if last == EMPTY else (None, None) if last == START else self.coords[last]
+		 for last in self.prev]
+	return [tiles[i*self.n:(i+1)*self.n] for i in xrange(self.n)]
+
+    def symmetries(self):
+	"Get the symmetries mapping the position onto itself; see fixing_symmetries."
+	return fixing_symmetries(self.n, self.occupied, self.pos_x[0]*self.n + self.pos_x[1],
+				 self.pos_o[0]*self.n + self.pos_o[1])
+
+    def get_mobility(self, pos):
+	"Get the number of moves a pawn on tile pos could make."
+	return _mobility(self.rays[pos[0]*self.n + pos[1]], self.occupied)
+
+    def clear_board(self):
+	"Clear board for reuse."
+	last = self.n*self.n - 1
+	self.pos_x = (0, 0)
+	self.pos_o = (self.size, self.size)
+	self.prev = array('h', [EMPTY]) * (self.n*self.n)
+	self.prev[0] = self.prev[last] = START
+	self.occupied = self.bits[0] | self.bits[last]
+	self.hash = self.zobrist_hash()
+	self.legal = None
+
+    def zobrist_hash(self):
+	"Compute the Zobrist hash of the board (player 1 to move) from scratch."
+	mined, pawn_p1, pawn_p2, side = self.zobrist
+	h, occupied = 0, self.occupied
+	for sq in xrange(self.n*self.n):
+	    if occupied & self.bits[sq]: h ^= mined[sq]
+	p1 = self.pos_x[0]*self.n + self.pos_x[1]
+	p2 = self.pos_o[0]*self.n + self.pos_o[1]
+	return h ^ mined[p1] ^ pawn_p1[p1] ^ mined[p2] ^ pawn_p2[p2]
+
+    def canonical_hash(self, whose_ply):
+	'''Return the canonical hash of the position with player whose_ply to
+	move: the smallest Zobrist hash over the 8 symmetries of the board.
+
+	@whose_ply: either 'p1' or 'p2'
+	@return: a tuple (hash, index of the symmetry giving it)
+	'''
+
+	mined, pawn_p1, pawn_p2, side = self.zobrist
+	perms = _get_symmetries(self.n)[0]
+	keys = _get_images(self.n)[1]
+	p1 = self.pos_x[0]*self.n + self.pos_x[1]
+	p2 = self.pos_o[0]*self.n + self.pos_o[1]
+	hashes = []
+	for perm, table in zip(perms, keys):
+	    h, mask, c = side if whose_ply == 'p2' else 0, self.occupied, 0
+	    while mask:
+		h ^= table[c][mask & 255]
+		mask >>= 8
+		c += 1
+	    h ^= mined[perm[p1]] ^ pawn_p1[perm[p1]] ^ mined[perm[p2]] ^ pawn_p2[perm[p2]]
+	    hashes.append(h)
+	key = min(hashes)
+	return key, hashes.index(key)
+
+    def to_canonical(self, move, sym):
+	"Map a move to its square index under symmetry 'sym'."
+	return _get_symmetries(self.n)[0][sym][move[0]*self.n + move[1]]
+
+    def from_canonical(self, sq, sym):
+	"Map a square index under symmetry 'sym' back to a move; undoes to_canonical."
+	return self.coords[_get_symmetries(self.n)[1][sym][sq]]
+
+    def copy(self):
+	"Return an independent copy of the BitBoard object."
+	bboard = object.__new__(BitBoard)
+	for name in self.__slots__: setattr(bboard, name, getattr(self, name))
+	bboard.prev = array('h', self.prev)
+	return bboard
+
+    @classmethod
+    def from_board(cls, board):
+	'''Build a BitBoard holding the same position as a Board object.
+
+	@board: a Board object reference
+	@return: a new BitBoard object
+	'''
+
+	bboard = cls(board.size+1, board.sym_p1, board.sym_p2)
+	bboard.occupied = 0
+	for i, row in enumerate(board.get_board()):
+	    for j, tile in enumerate(row):
+		if tile:
+		    sq = i*bboard.n + j
+		    bboard.occupied |= bboard.bits[sq]
+		    bboard.prev[sq] = START if tile == (None, None) else tile[0]*bboard.n + tile[1]
+		else:
+		    bboard.prev[i*bboard.n + j] = EMPTY
+	bboard.pos_x = tuple(board.get_position('p1'))
+	bboard.pos_o = tuple(board.get_position('p2'))
+	bboard.hash = bboard.zobrist_hash()
+	return bboard
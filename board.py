@@ -9,24 +9,22 @@ A data structure to represent a Board object in game Isolation.
 
 """
 
-def singleton(cls):
-    "singleton function object used to decorate class Board."
-    instances = {}
-    def getInstance():
-        if cls not in instances:
-            instances[cls] = cls()
-    	return instances[cls]
-    return getInstance
-
-@singleton
+from bitboard import _get_tables, _mobility, fixing_symmetries
+
 class Board(object):
     '''Class Board
   
-    This is a decorated class, decorated by singleton function object. That said, 
-    class Game can only be instantiated once, and hence remain singleton instance 
-    at all times. Internally, Board uses a dictionary to represent a board.
+    Internally, Board uses a list of lists to represent a board. Any number
+    of boards can be created, one per game.
+
+    Board also keeps the occupied tiles as a bit mask, updated on every
+    move. With the ray tables shared with class BitBoard, the moves and
+    the mobility of any tile are then a few lookups.
     '''
 
+    __slots__ = ('size', 'sym_p1', 'sym_p2', 'board', 'pos_x', 'pos_o', 'occupied',
+		 'bits', 'rays', 'legal')
+
     def __init__(self, size=8, sym_p1='x', sym_p2='o'):
 	'''
 	@board: initial board
@@ -42,26 +40,31 @@ class Board(object):
 	self.board[self.size][self.size] = self.board[0][0] = (None, None)
 	self.pos_x = (0, 0)
 	self.pos_o = (self.size, self.size)
+	self.bits, coords, self.rays = _get_tables(size)
+	self.occupied = self.bits[0] | self.bits[-1]
+	self.legal = None   # the legal moves cached by module moves
     
     def __str__(self):
 	"Return human-readable string of Board object"
 
-	s = '\n  '
+	w = len(str(self.size))   # the width of a column
+	s = '\n' + ' '*(w+1)
 	
 	# header string
 	for i in xrange(self.size+1):
-	    s += str(i) + ' '
+	    s += '%-*d ' % (w, i)
 	s += '\n'
 
 	# the rest of the board
 	for i in xrange(self.size+1):
 	    for j in xrange(self.size+1):
-		if j == 0: s += str(i) + ' '
+		if j == 0: s += '%*d ' % (w, i)
 		if self.board[i][j]: 
-		    if self.pos_x==(i,j):   s += self.sym_p1 + ' '
-		    elif self.pos_o==(i,j): s += self.sym_p2 + ' '
-		    else:		    s += '* '
-		else:		     	 s += '- '
+		    if self.pos_x==(i,j):   tile = self.sym_p1
+		    elif self.pos_o==(i,j): tile = self.sym_p2
+		    else:                   tile = '*'
+		else:                    tile = '-'
+		s += tile.ljust(w) + ' '
 	    s += '\n'
 	return s
     
@@ -79,6 +82,8 @@ class Board(object):
 	else:
 	    self.board[move[0]][move[1]] = self.pos_o   # memorize last pawn position!
 	    self.pos_o = move
+	self.occupied |= self.bits[move[0]*(self.size+1) + move[1]]
+	self.legal = None
     
     def delete_move(self, move, whose_turn): 
 	'''Unmake the move on board for player whose_turn.
@@ -94,6 +99,8 @@ class Board(object):
 	else:
 	    self.pos_o = self.board[move[0]][move[1]]   # update pawn position to previous one
 	    self.board[move[0]][move[1]] = None   	# delete move
+	self.occupied ^= self.bits[move[0]*(self.size+1) + move[1]]
+	self.legal = None
 
     def get_position(self, who):
 	"Get the current position of the player (who) on board."
@@ -103,6 +110,16 @@ class Board(object):
 	"Get the dictionary 'board'"
 	return self.board
 
+    def symmetries(self):
+	"Get the symmetries mapping the position onto itself; see fixing_symmetries."
+	n = self.size+1
+	return fixing_symmetries(n, self.occupied, self.pos_x[0]*n + self.pos_x[1],
+				 self.pos_o[0]*n + self.pos_o[1])
+
+    def get_mobility(self, pos):
+	"Get the number of moves a pawn on tile pos could make."
+	return _mobility(self.rays[pos[0]*(self.size+1) + pos[1]], self.occupied)
+
     def clear_board(self):
 	"Clear board array for reuse."
 	del self.board[:]
@@ -110,3 +127,5 @@ class Board(object):
 	self.pos_o = (self.size, self.size)
 	self.board = [[None for j in xrange(self.size+1)] for i in xrange(self.size+1)]
 	self.board[self.size][self.size] = self.board[0][0] = (None, None)
+	self.occupied = self.bits[0] | self.bits[-1]
+	self.legal = None
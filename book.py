@@ -0,0 +1,187 @@
+#!/usr/bin/python
+
+"""Module book
+Opening book for Game Isolation: an offline builder, and a reader looking
+positions up in the book file through mmap.
+
+The book file is a header followed by fixed-size records sorted by key:
+
+    header: magic 'ISOBOOK1', board length (1 byte), record count (4 bytes)
+    record: canonical position hash (8 bytes), best move (1 byte)
+
+The move is stored as a square index in the frame of the symmetry giving
+the canonical hash (see BitBoard.canonical_hash), so one record serves all
+symmetric copies of a position.
+
+Usage: python book.py [-d DEPTH] [-p PLIES] [BOOK_FILE]
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: book.py
+
+"""
+
+import os
+import mmap
+import struct
+import argparse
+
+from bitboard import BitBoard
+from ttable import TranspositionTable
+from moves import is_legal
+from algo import *
+from algo import _next_moves
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+MAGIC = 'ISOBOOK1'
+HEADER = struct.Struct('<8sBI')   # magic, board length, record count
+RECORD = struct.Struct('<QB')     # key, move square
+
+# the book Game looks for
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'book.bin')
+
+# books opened by open_book, by path; shared by all games of a process
+_books = {}
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+class OpeningBook(object):
+    '''Class OpeningBook
+
+    A read-only opening book. The file is memory-mapped and searched in
+    place with a binary search, so opening a book parses nothing.
+    '''
+
+    def __init__(self, path=BOOK_FILE):
+	'''
+	@path: the book file written by build_book
+	'''
+
+	self.file = open(path, 'rb')
+	self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+	magic, self.size, self.count = HEADER.unpack_from(self.data, 0)
+	if magic != MAGIC or len(self.data) != HEADER.size + self.count*RECORD.size:
+	    self.close()
+	    raise ValueError('%s is not an opening book' % path)
+
+    def __len__(self):
+	"Return the number of positions in the book."
+	return self.count
+
+    def find(self, key):
+	'''Binary-search the book for a canonical position hash.
+
+	@key: the canonical hash of the position
+	@return: the stored move square, or None if the position misses
+	'''
+
+	low, high = 0, self.count
+	while low < high:
+	    mid = (low + high) // 2
+	    mid_key, sq = RECORD.unpack_from(self.data, HEADER.size + mid*RECORD.size)
+	    if mid_key == key: return sq
+	    if mid_key < key: low = mid + 1
+	    else:             high = mid
+	return None
+
+    def lookup(self, whose_ply, board):
+	'''Return the book move for player whose_ply, or None if the
+	position is not in the book.
+
+	@whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+	@board: a BitBoard object reference
+	@return: the move (a tuple), or None
+	'''
+
+	if board.n != self.size: return None
+	key, sym = board.canonical_hash(whose_ply)
+	sq = self.find(key)
+	if sq is None: return None
+
+	# guard against hash collisions: the move must be legal here
+	move = board.from_canonical(sq, sym)
+	return move if is_legal(whose_ply, board, move) else None
+
+    def close(self):
+	"Unmap and close the book file."
+	self.data.close()
+	self.file.close()
+
+def open_book(path=BOOK_FILE):
+    '''Return the opening book at path, opened once per process and shared
+    by every caller, or None if there is no book file.'''
+
+    if path not in _books:
+	_books[path] = OpeningBook(path) if os.path.exists(path) else None
+    return _books[path]
+
+def build_book(path, depth=10, plies=8, size=8, verbose=False):
+    '''Search the opening tree and write the book file.
+
+    Both sides are played by the engine in turn: on the engine's plies only
+    its best move is followed, on the opponent's plies every reply is.
+    Each position the engine has to move in is searched to 'depth'.
+
+    --- Function Arguments ---
+    @path: the book file to write
+    @depth: the search depth for every book position
+    @plies: how many plies deep from the start position the book reaches
+    @size: the board length
+    @verbose: print every position added
+    @return: the number of positions written
+    '''
+
+    entries, seen = {}, set()
+    tt, ordering = TranspositionTable(), MoveOrdering()
+
+    def expand(board, who, engine, plies_left):
+	key, sym = board.canonical_hash(who)
+	if plies_left == 0 or (key, engine) in seen: return
+	seen.add((key, engine))
+
+	if who == engine:
+	    if key not in entries:
+		move = alpha_beta_root(who, board, depth, NEG_INFINITY, POS_INFINITY,
+				       tt, ordering=ordering)
+		entries[key] = move and board.to_canonical(move, sym)
+		if verbose: print '%016x' % key, move
+	    if entries[key] is None: return
+	    replies = [board.from_canonical(entries[key], sym)]
+	else:
+	    replies = _next_moves(who, board)
+
+	for move in replies:
+	    board.set_move(move, who)
+	    expand(board, 'p1' if who == 'p2' else 'p2', engine, plies_left-1)
+	    board.delete_move(move, who)
+
+    for engine in ('p1', 'p2'):
+	expand(BitBoard(size), 'p1', engine, plies)
+
+    records = sorted((key, sq) for key, sq in entries.items() if sq is not None)
+    f = open(path, 'wb')
+    try:
+	f.write(HEADER.pack(MAGIC, size, len(records)))
+	for key, sq in records:
+	    f.write(RECORD.pack(key, sq))
+    finally:
+	f.close()
+    return len(records)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the opening book of Game Isolation.')
+    parser.add_argument('path', nargs='?', default=BOOK_FILE, help='book file to write')
+    parser.add_argument('-d', '--depth', type=int, default=10, help='search depth per position')
+    parser.add_argument('-p', '--plies', type=int, default=8, help='plies covered by the book')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print every position')
+    args = parser.parse_args()
+
+    count = build_book(args.path, args.depth, args.plies, verbose=args.verbose)
+    print 'wrote', count, 'positions to', args.path
+
+if __name__ == '__main__': main()
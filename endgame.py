@@ -0,0 +1,218 @@
+#!/usr/bin/python
+
+"""Module endgame
+Exact endgame solver for positions in which the two pawns can no longer
+reach each other.
+
+Once the mined tiles cut the board so that no empty tile can be reached by
+both pawns, neither player can block the other any more, and the game is
+decided by who can make the longer path in his own region. The longest
+path is found by a memoized depth-first search, pruned with the size of
+the region still reachable. Most positions are already decided by bounds:
+a greedy path gives a lower bound and the region size an upper bound.
+Regions too large to solve within MAX_NODES are left to the Alpha-Beta
+search.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: endgame.py
+
+"""
+
+from bitboard import BitBoard
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# the longest-path cache is dropped once it holds more entries than this
+MAX_MEMO = 1 << 20
+
+# the number of search nodes solve() may spend before giving up
+MAX_NODES = 10000
+
+# (board length, region, square) -> longest path length; shared by all
+# searches on boards of every size
+_memo = {}
+
+# flood-fill masks, one entry per board size
+_masks = {}
+
+#=====================================================================#
+#                         Private Functions                           #
+#=====================================================================#
+
+class _Unsolved(Exception):
+    "Raised by _longest when the node budget of solve() is used up."
+    pass
+
+def _get_masks(n):
+    '''Return the masks (full, not_first_column, not_last_column) for a
+    board of length n.'''
+
+    if n not in _masks:
+	full = (1 << n*n) - 1
+	first = sum(1 << i*n for i in xrange(n))
+	_masks[n] = (full, full ^ first, full ^ (first << n-1))
+    return _masks[n]
+
+def _flood(seed, empty, n):
+    '''Return the empty tiles connected to the tiles in 'seed' through empty
+    tiles in any of the 8 directions. A pawn can only ever reach tiles in
+    this region.
+
+    --- Function Arguments ---
+    @seed: the mask of tiles to start from (usually a pawn)
+    @empty: the mask of empty tiles
+    @n: the board length
+    @return: a mask of tiles
+    '''
+
+    full, not_first, not_last = _get_masks(n)
+    region, frontier = 0, seed
+    while frontier:
+	row = frontier | ((frontier << 1) & not_first) | ((frontier >> 1) & not_last)
+	frontier = (row | (row << n) | (row >> n)) & empty & ~region & full
+	region |= frontier
+    return region
+
+def _count(mask):
+    "Return the number of tiles in mask."
+    return bin(mask).count('1')
+
+def _moves(sq, empty, board):
+    "Return the squares a pawn on square sq can move to within 'empty'."
+
+    blocked, n = ~empty, board.n
+    return [i*n + j for mask, moves, counts in board.rays[sq]
+	    for i, j in moves[mask & blocked]]
+
+def _greedy(sq, region, board):
+    '''Return a path (list of squares) from square sq within 'region',
+    always moving to the square with the fewest onward moves.'''
+
+    path = []
+    while True:
+	children = [(len(_moves(move, region ^ board.bits[move], board)), move)
+		    for move in _moves(sq, region, board)]
+	if not children: return path
+	sq = min(children)[1]
+	region ^= board.bits[sq]
+	path.append(sq)
+
+def _longest(sq, region, board, budget):
+    '''Return the length of the longest path a pawn on square sq can make
+    within the tiles of 'region'.
+
+    --- Function Arguments ---
+    @sq: the square of the pawn
+    @region: the mask of empty tiles the pawn can still use
+    @board: a BitBoard object reference; supplies the ray tables
+    @budget: a one-item list holding the number of nodes left
+    @return: the number of moves on the longest path
+    '''
+
+    key = (board.n, region, sq)
+    if key in _memo: return _memo[key]
+
+    budget[0] -= 1
+    if budget[0] < 0: raise _Unsolved()
+
+    # try the moves leaving the fewest onward moves first (Warnsdorff's
+    # rule); they tend to lead to the longest paths
+    children = []
+    for move in _moves(sq, region, board):
+	rest = region ^ board.bits[move]
+	children.append((len(_moves(move, rest, board)), move, rest))
+    children.sort()
+
+    best, most = 0, _count(region)
+    for onward, move, rest in children:
+	if 1 + _count(_flood(board.bits[move], rest, board.n)) <= best:
+	    continue   # cannot beat the best path found so far
+	length = 1 + _longest(move, rest, board, budget)
+	if length > best:
+	    best = length
+	    if best == most: break   # every tile is used; optimal
+
+    if len(_memo) >= MAX_MEMO: _memo.clear()
+    _memo[key] = best
+    return best
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+def regions(board):
+    '''Return the regions (masks of empty tiles) the pawns of player 1 and
+    player 2 can still reach.
+
+    @board: a BitBoard object reference
+    @return: a tuple (region of p1, region of p2)
+    '''
+
+    empty = ~board.occupied & _get_masks(board.n)[0]
+    p1, p2 = board.get_position('p1'), board.get_position('p2')
+    return (_flood(board.bits[p1[0]*board.n + p1[1]], empty, board.n),
+	    _flood(board.bits[p2[0]*board.n + p2[1]], empty, board.n))
+
+def is_separated(board):
+    "Check if no empty tile can be reached by both pawns on 'board'."
+    region_p1, region_p2 = regions(board)
+    return not region_p1 & region_p2
+
+def longest_path(who, board, max_nodes=MAX_NODES):
+    '''Return the longest path player 'who' can make in his own region.
+    Only meaningful if is_separated(board).
+
+    @who: either 'p1' or 'p2'
+    @board: a BitBoard object reference
+    @max_nodes: the number of search nodes to spend at most
+    @return: a tuple (number of moves, first move or None), or None if the
+	     region could not be solved within max_nodes
+    '''
+
+    region = regions(board)[0 if who == 'p1' else 1]
+    pos = board.get_position(who)
+    best, best_move, budget = 0, None, [max_nodes]
+    try:
+	for move in _moves(pos[0]*board.n + pos[1], region, board):
+	    length = 1 + _longest(move, region ^ board.bits[move], board, budget)
+	    if length > best: best, best_move = length, board.coords[move]
+    except _Unsolved:
+	return None
+    return best, best_move
+
+def solve(whose_ply, board):
+    '''Solve a position in which the pawns are separated.
+
+    The player to move wins if his longest path is longer than the
+    opponent's. Either way the best move is the first move of his longest
+    path: the opponent has no way to shorten it.
+
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+    @board: Board or BitBoard object reference
+    @return: None if the pawns are not separated or the regions are too
+	     large to solve, otherwise a tuple
+	     (True if whose_ply wins, best move or None if he has none)
+    '''
+
+    if not isinstance(board, BitBoard): board = BitBoard.from_board(board)
+    region_p1, region_p2 = regions(board)
+    if region_p1 & region_p2: return None
+
+    # try to decide the game with the bounds first
+    opponent = 'p1' if whose_ply=='p2' else 'p2'
+    if whose_ply == 'p2': region_p1, region_p2 = region_p2, region_p1
+    pos, pos_oppt = board.get_position(whose_ply), board.get_position(opponent)
+    path = _greedy(pos[0]*board.n + pos[1], region_p1, board)
+    move = board.coords[path[0]] if path else None
+    if len(path) > _count(region_p2): return True, move
+    if _count(region_p1) <= len(_greedy(pos_oppt[0]*board.n + pos_oppt[1], region_p2, board)):
+	return False, move
+
+    mine = longest_path(whose_ply, board)
+    theirs = mine and longest_path(opponent, board)
+    if not theirs: return None
+    return mine[0] > theirs[0], mine[1]
@@ -9,96 +9,109 @@ Game engine for Game Isolation. It is also an agent bridging AI module and UI mo
 
 """
 
-from board import Board
+from bitboard import BitBoard
+from ttable import TranspositionTable
+from book import open_book
+from ponder import Ponderer
+from moves import legal_moves, is_legal
 from algo import *
 from ui_cmdline import Terminal
 
+# the transposition tables shared by all games of the process, by
+# evaluation function; see Game.get_tt
+_tables = {}
+
 class Game(object):
     '''Class Game
 
-    This class implements the game engine for game Isolation.
+    This class implements the game engine for game Isolation. Games are
+    independent of each other, so many of them can run in one process.
     '''
 
-    def __init__(self):
-	self.board = Board()
+    __slots__ = ('board', 'cur_turn', 'gameover', 'winner', 'pc_first', 'algo', 'ui', 'nom',
+		 'tt', 'time_limit', 'node_limit', 'ordering', 'book', 'log', 'ponder', 'pondered',
+		 'moves', 'recorder', 'evaluate')
+
+    # size of the transposition table shared by all games of the process
+    # with the same evaluation function, allocated on the first AI move of
+    # any of them
+    TT_ENTRIES = 1 << 20
+
+    def __init__(self, ui=None, board=None, size=8):
+	'''
+	@ui: the user interface; defaults to a command line Terminal
+	@board: the board to play on; defaults to a new BitBoard
+	@size: the board length, if no board is given
+	'''
+
+	self.board = board or BitBoard(size)
 	self.cur_turn = 'p1'
 	self.gameover = False
 	self.winner = 'n/a'
 	self.pc_first = True		# game engine goes first
-	self.algo = alpha_beta_root     # assigning function pointer
-	self.ui = Terminal(self.board)	# game UI is command line terminal!
+	self.algo = alpha_beta_root     # assigning function pointer; or pvs_root, or a
+					# mcts.MonteCarlo, which keeps its tree
+	self.evaluate = hef             # leaf evaluation function; see EVALUATORS
+	self.ui = ui or Terminal(self.board)  # command line terminal by default
 	self.nom = 2 			# number of moves done on board
+	self.tt = None                  # own table; None: shared by games evaluating alike
+	self.time_limit = None          # seconds per AI move; None: depth table
+	self.node_limit = None          # optional node budget per AI move
+	self.ordering = MoveOrdering()  # killer/history ordering; None: off
+	self.book = open_book()         # shared by all games; None if missing
+	self.log = None                 # file to log search statistics to; None: off
+	self.ponder = None              # 'predicted' or 'all' replies; None: off
+	self.pondered = None            # the ponder result for the reply played
+	self.moves = []                 # (who, move, search stats or None) per move
+	self.recorder = None            # RecordWriter games are saved to; None: off
   
-    def __get_direction(self, pos, move):
-	'''Find the direction of move relative to pos.
+    def __set_gameover(self):
+	"A helper function to set gameover and winner flag."
+	
+	self.gameover = True
+    	self.winner = 'p1' if self.cur_turn=='p2' else'p2'
 
-	Return 'N', 'NE', 'E', 'SE', 'S', 'SW', 'W' or 'NW'.
-	'''
+    def get_tt(self):
+	'''Return the transposition table of the game: its own if it was
+	given one, else the one shared by all games of the process with the
+	same evaluation function. The scores stored are those of the
+	evaluation function, so games evaluating differently keep apart.'''
 
-	if move[1]==pos[1] and move[0]<pos[0]: return 'N'
-	if move[1]==pos[1] and move[0]>pos[0]: return 'S'
-	if move[0]==pos[0] and move[1]<pos[1]: return 'W'
-	if move[0]==pos[0] and move[1]>pos[1]: return 'E'
-	if move[1]>pos[1] and (move[1]-pos[1])==(move[0]-pos[0]): return 'SE'
-	if move[1]<pos[1] and (move[1]-pos[1])==(move[0]-pos[0]): return 'NW'
-	if move[1]>pos[1] and (move[1]-pos[1])==(pos[0]-move[0]): return 'NE'
-	if move[1]<pos[1] and (move[1]-pos[1])==(pos[0]-move[0]): return 'SW'
+	if self.tt is not None: return self.tt
+	tt = _tables.get(self.evaluate)
+	if tt is None: tt = _tables[self.evaluate] = TranspositionTable(self.TT_ENTRIES)
+	return tt
 
-	# move is not in any of the 8 directions:
-	return None
+    def __start_pondering(self):
+	"A helper function to start pondering on the human player's time."
 
-    def __is_blocked(self, drt, pos, move):
-	'''Check if move is blocked by visited positions on board. 
-	
-	--- Function Arguments ---
-	@drt: direction the move is in.
-	@pos: the original position the pawn was at.
-	@move: the move the pawn at pos try to make.
-	@return: True if blocked, otherwise False.
-	'''
+	engine = 'p1' if self.cur_turn=='p2' else 'p2'
+	ponderer = Ponderer(engine, self.board, self.get_tt(), self.ordering, self.evaluate,
+			    self.algo, self.ponder=='all')
+	ponderer.start()
+	return ponderer
 
-	board = self.board.get_board()
-	if drt == 'N':
-	    for i in xrange(1, pos[0]-move[0]):
-	    	if board[pos[0]-i][pos[1]]: return True
-	elif drt == 'S':
-	    for i in xrange(1, move[0]-pos[0]):
-	    	if board[pos[0]+i][pos[1]]: return True
-	elif drt == 'E':
-	    for i in xrange(1, move[1]-pos[1]):
-	    	if board[pos[0]][pos[1]+i]: return True
-	elif drt == 'W':
-	    for i in xrange(1, pos[1]-move[1]):
-	    	if board[pos[0]][pos[1]-i]: return True
-	elif drt == 'NE':
-	    for i in xrange(1, move[1]-pos[1]):
-	    	if board[pos[0]-i][pos[1]+i]: return True
-	elif drt == 'NW':
-	    for i in xrange(1, pos[1]-move[1]):
-	    	if board[pos[0]-i][pos[1]-i]: return True
-	elif drt == 'SE':
-	    for i in xrange(1, move[1]-pos[1]):
-	    	if board[pos[0]+i][pos[1]+i]: return True
-	else:	# SW
-	    for i in xrange(1, pos[1]-move[1]):
-	    	if board[pos[0]+i][pos[1]-i]: return True
-	return False
+    def __move_stats(self, stats):
+	"A helper function to sum SearchStats up as a (depth, nodes, score) tuple."
 
-    def __set_gameover(self):
-	"A helper function to set gameover and winner flag."
-	
-	self.gameover = True
-    	self.winner = 'p1' if self.cur_turn=='p2' else'p2'
+	if not stats.iterations: return None
+	last = stats.iterations[-1]
+	return last['depth'], sum(it['nodes'] for it in stats.iterations), last['score']
 
     def __set_search_depth(self):
 	"A helper function to set search depth for alpha-beta algorithm."
 	
-	if self.nom <= 15: return 6
-	elif self.nom <= 25: return 8
-	elif self.nom <= 35: return 10
-	elif self.nom <= 45: return 12
-	elif self.nom <= 55: return 14
-	else: return 10 
+	# the game phase is the number of moves done, scaled to an 8x8 board;
+	# larger boards have many more moves per ply, and search shallower
+	n = self.board.size+1
+	nom = self.nom * 64 // (n*n)
+	if nom <= 15: depth = 6
+	elif nom <= 25: depth = 8
+	elif nom <= 35: depth = 10
+	elif nom <= 45: depth = 12
+	elif nom <= 55: depth = 14
+	else: depth = 10 
+	return max(2, depth - max(0, (n-8) // 4))
     
     def is_valid_move(self, move):
 	'''Check if move is valid.
@@ -110,63 +123,108 @@ class Game(object):
 	@return: False if not a valid move, otherwise True.
 	'''
     	
-	# check entry validity
-    	if not move[0] in xrange(self.board.size+1): return False
-    	if not move[1] in xrange(self.board.size+1): return False
+	return is_legal(self.cur_turn, self.board, move)
 
-	# check if move already exists on board!
-	board = self.board.get_board()
-	if board[move[0]][move[1]]: return False
+    def legal_moves(self):
+	'''Get the legal moves of the player in the current turn.
 
-	# check if move direction is correct
-	pos = self.board.get_position(self.cur_turn)
-	drt = self.__get_direction(pos, move)
-	if not drt: return False
+	@return: a frozenset of moves; empty if the player is stuck
+	'''
 
-	# check if move is blocked by visited moves on the path
-	if self.__is_blocked(drt, pos, move): return False
-	return True
+	return legal_moves(self.cur_turn, self.board)
 
-    def make_move(self, move):
+    def make_move(self, move, stats=None):
 	"Make the move for the player in the current turn. Assume move is sanitized and checked."
 
 	self.board.set_move(move, self.cur_turn)
+	self.moves.append((self.cur_turn, move, stats))
 	self.cur_turn = 'p1' if self.cur_turn=='p2' else 'p1'
 	self.nom += 1
 
     def ai_goes(self):
 	"Game AI makes his move."
 
-	# determine the depth for alpha-beta algorithm to search first
-    	depth = self.__set_search_depth()
-
-        # find best move that can be searched so far
-	move = self.algo(self.cur_turn, self.board, depth, NEG_INFINITY, POS_INFINITY)
+        # find best move that can be searched so far; the search runs on a
+	# bitboard, which is much faster to walk
+	bboard = self.board if isinstance(self.board, BitBoard) else BitBoard.from_board(self.board)
+	tt = self.get_tt()
+	# positions in the opening book need no search at all
+	move = self.book and self.book.lookup(self.cur_turn, bboard)
+	source = 'from the opening book'
+	# a search pondered deep enough on the opponent's time is taken as it
+	# is; otherwise it has left the table warmed up for the search
+	pondered, self.pondered = self.pondered, None
+	if not move and pondered and not (self.time_limit or self.node_limit) and \
+	   pondered[0] >= self.__set_search_depth():
+	    move, source = pondered[1], 'pondered to depth %d' % pondered[0]
+	# search statistics are only collected when they are logged or recorded
+	extra = {'stats': SearchStats()} if (self.log or self.recorder) and not move else {}
+	if not move:
+	    if self.time_limit or self.node_limit:
+		# search as deep as the time (or node) budget allows
+		move = iterative_deepening(self.cur_turn, bboard, self.time_limit,
+					   self.node_limit, tt=tt, ordering=self.ordering,
+					   evaluate=self.evaluate, root=self.algo, **extra)
+	    else:
+		# determine the depth for alpha-beta algorithm to search first
+		depth = self.__set_search_depth()
+		move = self.algo(self.cur_turn, bboard, depth, NEG_INFINITY, POS_INFINITY,
+				 tt=tt, ordering=self.ordering, evaluate=self.evaluate, **extra)
+	if self.log:
+	    self.log.write('move %d (%s): %s\n%s\n' % (self.nom+1, self.cur_turn, move,
+			   extra['stats'] if extra else source))
+	    self.log.flush()
 
 	# best move can be 'not found' when AI knows it loses 
 	# in that case a 'None' type is returned!
-	if move: self.make_move(move)
+	if move: self.make_move(move, self.__move_stats(extra['stats']) if extra else None)
 	else: self.__set_gameover()
 
     def human_goes(self):
 	"Human player make his/her move."
         
 	self.cur_turn = 'p2'
-	while True:
-            move = self.ui.prompt_user_input()
-	    if self.ui.is_surrender_move(move): 
-		self.__set_gameover()
-		break
-    	    elif self.is_valid_move(move): 
-		self.make_move(move)
-		break
-	    else:
-		print 'Illegitimate move!'
+	if not self.legal_moves():
+	    self.__set_gameover()   # no move left to make
+	    return
+	ponderer = self.ponder and self.__start_pondering()
+	move = None
+	try:
+	    while True:
+		move = self.ui.prompt_user_input()
+		if self.ui.is_surrender_move(move): 
+		    self.__set_gameover()
+		    break
+		elif self.is_valid_move(move): 
+		    break
+		else:
+		    print 'Illegitimate move!'
+		    self.ui.print_hints(self.legal_moves())
+	finally:
+	    # keep the ponder result only if the move played was pondered
+	    if ponderer: self.pondered = ponderer.stop(move)
+	if not self.gameover: self.make_move(move)
+
+    def write_record(self, writer):
+	'''Write the moves of the game so far as a game record.
+
+	@writer: a RecordWriter
+	'''
+
+	if not self.moves: return
+	winner = self.winner if self.gameover else None
+	writer.write(self.board.size+1, self.moves[0][0], [move for who, move, stats in self.moves],
+		     winner, [stats for who, move, stats in self.moves])
 
     def reset_game(self):
 	"Reset all game states when game is over."
 	
+	# save the game before its moves are cleared
+	if self.recorder is not None: self.write_record(self.recorder)
+	self.moves = []
 	self.board.clear_board() 
+	if self.tt is not None: self.tt.clear()   # the shared table stays
+	self.pondered = None
 	self.cur_turn = 'p1'
 	self.gameover = False
 	self.winner = 'n/a'
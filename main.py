@@ -9,11 +9,17 @@ main.py is program entry point for Game Isolation.
 """
 
 from game import Game
+from tablebase import open_tablebase
+from algo import use_tablebase
 
 def main():
   ''' Main program of isolation 
   '''
     
+  # the endgame tablebase is probed by every search of the process;
+  # None if missing
+  use_tablebase(open_tablebase())
+
   # Initialize game isolation ...
   game = Game()
 
@@ -0,0 +1,334 @@
+#!/usr/bin/python
+
+"""Module mcts
+Monte Carlo Tree Search engine for Game Isolation, an alternative to the
+Alpha-Beta search where the branching factor is high and hef is weak.
+
+The engine grows a game tree with UCT: from the root it descends to the
+child with the best upper confidence bound on its win rate, adds one
+untried move as a new node, plays the game out from there with random
+moves, and counts the result on every node of the path. The move played
+is the most visited one at the root. The playouts run on the occupancy
+mask and two square indices only, with the ray tables of module bitboard;
+they can be biased towards moves leaving the pawn more moves.
+
+A MonteCarlo object is called like alpha_beta_root, so it can be used as
+Game.algo, as the root of iterative_deepening, or by a Ponderer. It keeps
+its tree from one call to the next: if the position searched is the root
+of the last search, or one or two plies below it, the search goes on from
+that node. With a process pool, each worker grows a tree of its own from
+the root (root parallelization) and the visit counts of the root moves
+are added up.
+
+The budget of a search is a number of playouts, or milliseconds; or the
+time or node limit of the SearchBudget passed in by the caller, in which
+every move played counts as a node. With none of them, 'depth' is turned
+into a number of playouts.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: mcts.py
+
+"""
+
+import math
+import time
+import random
+import multiprocessing
+
+from bitboard import BitBoard, _get_tables
+from algo import *
+from algo import _mobility
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# the weight of exploration against the win rate in the UCT formula
+EXPLORATION = 1.4
+
+# playouts per ply of the depth asked for, when there is no other budget
+PLAYOUTS_PER_DEPTH = 250
+
+# playouts between two readings of the clock
+CHECK_EVERY = 16
+
+#=====================================================================#
+#                         Private Functions                           #
+#=====================================================================#
+
+class _Node(object):
+    '''Class _Node
+
+    A node of the search tree: the move leading to it, the moves not yet
+    expanded, and the playouts through it with the wins of the player who
+    made the move.
+    '''
+
+    __slots__ = ('move', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, move, untried):
+	self.move = move         # square index; None at the root
+	self.children = []
+	self.untried = untried   # square indices
+	self.visits = 0
+	self.wins = 0.0
+
+def _squares(sq, occupied, n, rays):
+    "Return the square indices a pawn on square sq can move to."
+    return [i*n + j for mask, moves, counts in rays[sq] for i, j in moves[mask & occupied]]
+
+def _playout(occupied, mover, other, n, bits, rays, rng, biased):
+    '''Play a game out with random moves.
+
+    --- Function Arguments ---
+    @occupied: the occupancy mask
+    @mover: the square of the pawn to move
+    @other: the square of the other pawn
+    @n: the board length
+    @bits: the square masks, from _get_tables
+    @rays: the ray tables, from _get_tables
+    @rng: a random.Random object
+    @biased: of two random moves, make the one leaving more moves
+    @return: a tuple (True if the player to move wins, plies played)
+    '''
+
+    plies = 0
+    while True:
+	moves = []
+	for mask, table, counts in rays[mover]:
+	    moves.extend(table[mask & occupied])
+	if not moves: return plies % 2 == 1, plies
+
+	i, j = moves[int(rng.random() * len(moves))]
+	if biased and len(moves) > 1:
+	    k, l = moves[int(rng.random() * len(moves))]
+	    if _mobility(rays[k*n + l], occupied) > _mobility(rays[i*n + j], occupied): i, j = k, l
+	sq = i*n + j
+	occupied |= bits[sq]
+	mover, other = other, sq
+	plies += 1
+
+#=====================================================================#
+#                         Worker Processes                            #
+#=====================================================================#
+
+# the engine of a worker, set by _init_worker; keeps its own tree
+_engine = None
+
+def _init_worker(biased, exploration):
+    "Pool initializer: give the worker an engine of its own."
+    global _engine
+    _engine = MonteCarlo(biased=biased, exploration=exploration)
+
+def _search_worker(task):
+    '''Grow the worker's tree from a position; run in a worker process.
+
+    @task: a tuple (n, state, playouts, seconds, seed); see MonteCarlo._search
+    @return: a tuple ([(move, visits, wins)] of the root moves, plies played)
+    '''
+
+    n, state, playouts, seconds, seed = task
+    _engine.rng.seed(seed)
+    budget = SearchBudget()   # counts the plies
+    root = _engine._search(n, state, playouts, seconds, budget)
+    return [(child.move, child.visits, child.wins) for child in root.children], budget.nodes
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+class MonteCarlo(object):
+    '''Class MonteCarlo
+
+    The Monte Carlo Tree Search engine; called like alpha_beta_root.
+    '''
+
+    def __init__(self, playouts=None, time_ms=None, processes=None, biased=True,
+		 exploration=EXPLORATION, seed=None):
+	'''
+	@playouts: the number of playouts per search, or None
+	@time_ms: the milliseconds per search, or None
+	@processes: the number of worker processes for root-parallel
+		    playouts; None or 1 plays them in this process
+	@biased: bias the playouts towards moves leaving more moves
+	@exploration: the weight of exploration in the UCT formula
+	@seed: the seed of the random playouts
+	'''
+
+	self.playouts = playouts
+	self.time_ms = time_ms
+	self.processes = processes
+	self.biased = biased
+	self.exploration = exploration
+	self.rng = random.Random(seed)
+	self.root = None    # the tree kept from the last search
+	self.state = None   # (board length, occupancy, mover, other) at its root
+	self.pool = None
+
+    def __call__(self, whose_ply, board, depth, alpha, beta, tt=None, budget=None,
+		 first_move=None, ordering=None, evaluate=hef, stats=None):
+	'''Search the move of player whose_ply. Takes the arguments of
+	alpha_beta_root; alpha, beta, tt, first_move, ordering and evaluate
+	are not used.
+
+	--- Function Arguments ---
+	@whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+	@board: Board or BitBoard object reference; it is not changed
+	@depth: sets the number of playouts if there is no other limit
+	@budget: optional SearchBudget; the search stops when it runs out,
+		 and raises SearchTimeout if it has run out already or is
+		 stopped from outside
+	@stats: optional SearchStats; records the playouts and root moves
+	@return: the most visited move, or None if there is no move
+	'''
+
+	if budget is not None: budget.check()
+	if not isinstance(board, BitBoard): board = BitBoard.from_board(board)
+	n = board.n
+	pos = board.get_position(whose_ply)
+	pos_oppt = board.get_position('p1' if whose_ply == 'p2' else 'p2')
+	state = (board.occupied, pos[0]*n + pos[1], pos_oppt[0]*n + pos_oppt[1])
+	moves = _squares(state[1], state[0], n, board.rays)
+	if len(moves) <= 1: return board.coords[moves[0]] if moves else None
+
+	# a budget without limits only stops the search early, e.g. pondering;
+	# the workers of a pool cannot be stopped, only given a deadline
+	pooled = (self.processes or 1) > 1
+	limited = budget is not None and (budget.deadline or budget.max_nodes and not pooled)
+	playouts = self.playouts
+	if not (playouts or self.time_ms or limited): playouts = depth * PLAYOUTS_PER_DEPTH
+	seconds = self.time_ms / 1000.0 if self.time_ms else None
+	if stats is not None: stats.new_iteration(1)
+
+	if pooled:
+	    results = self._search_pool(n, state, playouts, seconds, budget)
+	    if budget is not None and budget.stopped: raise SearchTimeout()
+	else:
+	    root = self._search(n, state, playouts, seconds, budget)
+	    results = [(child.move, child.visits, child.wins) for child in root.children]
+
+	visits, move, wins = max((visits, move, wins) for move, visits, wins in results)
+	if stats is not None:
+	    stats.nodes[0] = stats.leaves = sum(result[1] for result in results)
+	    stats.root_moves = [(board.coords[sq], 100 * w / (v or 1), 0.0) for sq, v, w in results]
+	    stats.improve(1, board.coords[move])
+	    stats.end_iteration(board.coords[move], 100 * wins / visits)
+	return board.coords[move]
+
+    def _search(self, n, state, playouts, seconds, budget):
+	'''Grow the tree of a position; return its root node.
+
+	--- Function Arguments ---
+	@n: the board length
+	@state: the position, a tuple (occupancy, mover square, other square)
+	@playouts: the number of playouts, or None
+	@seconds: the time to stop after, or None
+	@budget: optional SearchBudget; every ply played counts as a node
+	@raise: SearchTimeout if the budget is stopped from outside
+	'''
+
+	root = self._reuse(n, state)
+	bits, coords, rays = _get_tables(n)
+	deadline = time.time() + seconds if seconds else None
+	count = 0
+	while playouts is None or count < playouts:
+	    if deadline and count % CHECK_EVERY == 0 and time.time() >= deadline: break
+	    plies = self._iterate(root, state, n, bits, rays)
+	    count += 1
+	    if budget is not None:
+		budget.nodes += plies
+		if budget.nodes >= budget.next_check:
+		    try:
+			budget.check()
+		    except SearchTimeout:
+			# a search stopped from outside has no result
+			if budget.stopped: raise
+			break
+	return root
+
+    def _search_pool(self, n, state, playouts, seconds, budget):
+	'''Grow a tree in every worker process, and add up the visits of the
+	root moves; the body of __call__ with processes.'''
+
+	if self.pool is None:
+	    self.pool = multiprocessing.Pool(self.processes, _init_worker,
+					     (self.biased, self.exploration))
+	if budget is not None and budget.deadline:
+	    left = budget.deadline - time.time()
+	    seconds = min(seconds, left) if seconds else left
+	share = playouts and max(1, playouts // self.processes)
+	tasks = [(n, state, share, seconds, self.rng.getrandbits(32))
+		 for i in xrange(self.processes)]
+
+	totals = {}
+	for results, plies in self.pool.map(_search_worker, tasks):
+	    if budget is not None: budget.nodes += plies
+	    for move, visits, wins in results:
+		total = totals.setdefault(move, [0, 0.0])
+		total[0] += visits
+		total[1] += wins
+	return [(move, visits, wins) for move, (visits, wins) in totals.iteritems()]
+
+    def _reuse(self, n, state):
+	'''Return the node of the kept tree holding position 'state', looking
+	at the root and two plies below it, and make it the root; or start a
+	new tree.'''
+
+	bits, coords, rays = _get_tables(n)
+	if self.root is not None and self.state[0] == n:
+	    occupied, mover, other = self.state[1:]
+	    nodes = [(self.root, occupied, mover, other)]
+	    for child in self.root.children:
+		nodes.append((child, occupied | bits[child.move], other, child.move))
+		for grandchild in child.children:
+		    nodes.append((grandchild, occupied | bits[child.move] | bits[grandchild.move],
+				  child.move, grandchild.move))
+	    for node, occupied, mover, other in nodes:
+		if (occupied, mover, other) == state:
+		    self.root, self.state = node, (n,) + state
+		    return node
+
+	self.root, self.state = _Node(None, _squares(state[1], state[0], n, rays)), (n,) + state
+	return self.root
+
+    def _iterate(self, root, state, n, bits, rays):
+	'''Run one playout: select a path down the tree, expand it by one
+	node, play out, and count the result on the path.
+
+	@return: the number of plies played, in the tree and the playout
+	'''
+
+	occupied, mover, other = state
+	node, path, c = root, [root], self.exploration
+	while not node.untried and node.children:
+	    log_visits, best, best_score = math.log(node.visits), None, -1.0
+	    for child in node.children:
+		score = child.wins / child.visits + c * math.sqrt(log_visits / child.visits)
+		if score > best_score: best, best_score = child, score
+	    node = best
+	    occupied |= bits[node.move]
+	    mover, other = other, node.move
+	    path.append(node)
+
+	if node.untried:
+	    move = node.untried.pop(int(self.rng.random() * len(node.untried)))
+	    occupied |= bits[move]
+	    mover, other = other, move
+	    child = _Node(move, _squares(mover, occupied, n, rays))
+	    node.children.append(child)
+	    path.append(child)
+
+	# the node's move was made by the player not to move after it
+	wins, plies = _playout(occupied, mover, other, n, bits, rays, self.rng, self.biased)
+	for node in reversed(path):
+	    node.visits += 1
+	    if not wins: node.wins += 1
+	    wins = not wins
+	return plies + len(path) - 1
+
+    def close(self):
+	"Terminate the worker processes, if any."
+	if self.pool is not None:
+	    self.pool.terminate()
+	    self.pool = None
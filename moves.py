@@ -0,0 +1,101 @@
+#!/usr/bin/python
+
+"""Module moves
+Move generation for Game Isolation, shared by the game engine, the user
+interfaces and the search.
+
+moves_from() walks the ray tables of a Board or BitBoard: a pawn moves
+like a queen, up to the first mined or occupied tile on each of the 8
+rays. The search orders and filters these moves itself (see module algo).
+reaches() checks a single move against the one ray it lies on, for the
+moves the search tries before generating the others.
+
+legal_moves() is the set of legal moves of a player in the current
+position, for checking the moves of human players and showing hints. The
+set is kept on the board until the next set_move, delete_move or
+clear_board, so asking again for the same position is a lookup; is_legal()
+is then a set membership test.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: moves.py
+
+"""
+
+from bitboard import DIRECTIONS
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# the index of every direction in DIRECTIONS, i.e. in the ray tables
+_RAY_INDEX = dict((d, k) for k, d in enumerate(DIRECTIONS))
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+def moves_from(pos, board, move_table=None):
+    '''Return the moves of a pawn on tile 'pos', ray by ray, nearest first.
+
+    --- Function Arguments ---
+    @pos: the tile of the pawn, a (row, column) tuple
+    @board: a Board or BitBoard object reference
+    @move_table: optional list to fill in, e.g. one kept for a ply of the
+		 search; it is emptied first
+    @return: a list of moves
+    '''
+
+    if move_table is None: move_table = []
+    else:                  del move_table[:]
+    occupied = board.occupied
+    for mask, moves, counts in board.rays[pos[0]*(board.size+1) + pos[1]]:
+	move_table.extend(moves[mask & occupied])
+    return move_table
+
+def reaches(pos, move, board):
+    '''Check if a pawn on tile 'pos' can move to tile 'move', looking at the
+    ray towards 'move' only.
+
+    --- Function Arguments ---
+    @pos: the tile of the pawn, a (row, column) tuple
+    @move: the tile to move to, a (row, column) tuple
+    @board: a Board or BitBoard object reference
+    @return: True or False
+    '''
+
+    di, dj = move[0] - pos[0], move[1] - pos[1]
+    if di and dj and di != dj and di != -dj: return False
+    k = _RAY_INDEX.get(((di > 0) - (di < 0), (dj > 0) - (dj < 0)))
+    if k is None: return False   # move == pos
+    mask, moves, counts = board.rays[pos[0]*(board.size+1) + pos[1]][k]
+    return move in moves[mask & board.occupied]
+
+def legal_moves(whose_ply, board):
+    '''Return the legal moves of player whose_ply in the current position;
+    cached on the board until the position changes.
+
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'
+    @board: a Board or BitBoard object reference
+    @return: a frozenset of moves
+    '''
+
+    cache = board.legal
+    if cache is None: cache = board.legal = {}
+    moves = cache.get(whose_ply)
+    if moves is None:
+	moves = cache[whose_ply] = frozenset(moves_from(board.get_position(whose_ply), board))
+    return moves
+
+def is_legal(whose_ply, board, move):
+    '''Check if player whose_ply can make move in the current position.
+
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'
+    @board: a Board or BitBoard object reference
+    @move: the move, a (row, column) tuple
+    @return: True or False
+    '''
+
+    return tuple(move) in legal_moves(whose_ply, board)
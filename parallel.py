@@ -0,0 +1,223 @@
+#!/usr/bin/python
+
+"""Module parallel
+Root-splitting parallel version of the Alpha-Beta search, run on a pool of
+worker processes.
+
+The pool is started by the first search and kept for the next ones, so
+the processes are not started anew for every move; close_pool() stops
+it. Only one search at a time may use it.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: parallel.py
+
+"""
+
+import time
+import multiprocessing
+
+import endgame
+from bitboard import BitBoard
+from ttable import EXACT, LOWER
+from algo import *
+from algo import _next_moves, _tt_first, _make_move, _unmake_move
+
+# root moves the shared score array has room for, at least
+ROOT_MOVES = 64
+
+# seconds between two looks at whether the budget was stopped, while the
+# workers search
+WAIT_STEP = 0.02
+
+# exact scores of the root moves searched so far, shared by all workers;
+# set in every worker process by _init_worker
+_scores = None
+
+# the pool kept from one search to the next, its number of processes, and
+# the score array its workers share
+_pool = None
+_pool_workers = 0
+_pool_scores = None
+
+def _add_stats(stats, counts):
+    "Add the statistics of a root move searched by a worker to 'stats'."
+
+    nodes, leaves, cutoffs, first_cutoffs, tablebase_hits, pv = counts
+    for ply in xrange(1, len(nodes)): stats.nodes[ply] += nodes[ply]
+    stats.leaves += leaves
+    stats.cutoffs += cutoffs
+    stats.first_cutoffs += first_cutoffs
+    stats.tablebase_hits += tablebase_hits
+
+def _init_worker(scores):
+    "Pool initializer: keep the shared score array of the search."
+    global _scores
+    _scores = scores
+
+def _get_pool(workers, size):
+    '''Return the kept pool and its score array, starting a new pool if
+    there is none yet, or it has another number of processes, or its score
+    array has fewer than 'size' entries.'''
+
+    global _pool, _pool_workers, _pool_scores
+    if _pool is None or _pool_workers != workers or len(_pool_scores) < size:
+	close_pool()
+	_pool_scores = multiprocessing.Array('d', max(size, ROOT_MOVES), lock=False)
+	_pool = multiprocessing.Pool(workers, _init_worker, (_pool_scores,))
+	_pool_workers = workers
+    return _pool, _pool_scores
+
+def _search_root_move(task):
+    '''Search one root move in a worker process.
+
+    The alpha bound is the best exact score among the root moves ordered
+    before this one that are already done. A serial search would use the
+    best score among all of them, which is at least as high, so the move
+    chosen from the results is the one the serial search chooses.
+
+    @task: a tuple (index, whose_ply, board, depth, alpha, beta, move, ordering,
+		   evaluate, deadline, max_nodes, collect): the search stops at
+		   the deadline (as time.time()) or after max_nodes nodes, if
+		   not None; with 'collect' set, statistics are collected
+    @return: a tuple (score, nodes, seconds, statistics or None), or None if
+	     the search ran out of its budget; the statistics are a tuple
+	     (nodes per ply, leaves, cutoffs, first-move cutoffs, tablebase
+	     hits, principal variation below the move)
+    '''
+
+    i, whose_ply, board, depth, alpha, beta, move, ordering, evaluate, \
+	deadline, max_nodes, collect = task
+    alpha = max([alpha] + _scores[:i])
+    next_ply_player = 'p1' if whose_ply=='p2' else 'p2'
+    budget = SearchBudget(None, max_nodes)
+    budget.deadline = deadline
+    stats = SearchStats() if collect else None
+    if stats is not None: stats.new_iteration(depth)
+    start = time.time()
+
+    _make_move(board, whose_ply, move)
+    try:
+	score = -alpha_beta(next_ply_player, board, depth-1, -beta, -alpha, None, budget,
+			    ordering, evaluate, stats)
+    except SearchTimeout:
+	return None
+    finally:
+	_unmake_move(board, whose_ply, move)
+    if score > alpha: _scores[i] = score   # exact, not just a bound
+    if stats is not None:
+	stats = (stats.nodes, stats.leaves, stats.cutoffs, stats.first_cutoffs,
+		 stats.tablebase_hits, stats.pv[1])
+    return score, budget.nodes, time.time() - start, stats
+
+def parallel_alpha_beta_root(whose_ply, board, depth, alpha, beta, tt=None, budget=None,
+			     first_move=None, ordering=None, evaluate=hef, stats=None,
+			     workers=None):
+    '''Parallel version of alpha_beta_root, taking the same arguments plus
+    'workers', so it can be used as Game.algo or as the root of
+    iterative_deepening. The root moves are handed out in order to a pool
+    of worker processes, each searching its own copy of the board;
+    finished moves raise the alpha bound of the moves started after them.
+    It returns the same move as alpha_beta_root without a table.
+
+    --- Function Arguments ---
+    @whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+    @board: Board or BitBoard object reference; the board state to be searched
+    @depth: the number of plys to search down the tree
+    @alpha: the score of node player
+    @beta: the score of opponent
+    @tt: optional TranspositionTable; only used to order and store the root
+    @budget: optional SearchBudget; SearchTimeout is raised when it runs
+	     out, or is stopped, before all root moves are searched
+    @first_move: optional move to search first, ahead of the table's move
+    @ordering: optional MoveOrdering; orders the root moves, and every
+	       task orders with a fresh one
+    @evaluate: the leaf evaluation function; must be a module-level function
+    @stats: optional SearchStats; collects the statistics of the search
+    @workers: the number of worker processes; defaults to the number of CPUs;
+	      the kept pool is started again if it has another number
+    @return: the best move so far
+    '''
+
+    if budget is not None: budget.check()
+    if not isinstance(board, BitBoard): board = BitBoard.from_board(board)
+    workers = workers or multiprocessing.cpu_count()
+
+    solved = endgame.solve(whose_ply, board)
+    if solved is not None:
+	if stats is not None: stats.solved = True
+	return solved[1]
+
+    tt_move = None
+    if tt is not None:
+	key = board.get_hash(whose_ply)
+	entry = tt.probe(key)
+	if entry is not None: tt_move = entry[4]
+    if first_move is not None: tt_move = first_move
+    moves = _next_moves(whose_ply, board)
+    if ordering is not None:
+	ordering.new_search()
+	moves = ordering.order(board.get_position(whose_ply), moves, depth)
+    moves = _tt_first(moves, tt_move)
+
+    if workers <= 1 or len(moves) <= 1 or depth <= 1:
+	return alpha_beta_root(whose_ply, board, depth, alpha, beta, tt, budget, first_move,
+			       ordering, evaluate, stats)
+
+    if stats is not None:
+	stats.new_iteration(depth)
+	stats.nodes[0] += 1
+    deadline = budget and budget.deadline
+    max_nodes = budget and budget.max_nodes and budget.max_nodes - budget.nodes
+    pool, scores = _get_pool(workers, len(moves))
+    for i in xrange(len(moves)): scores[i] = NEG_INFINITY
+    tasks = [(i, whose_ply, board, depth, alpha, beta, move, ordering and MoveOrdering(),
+	      evaluate, deadline, max_nodes, stats is not None)
+	     for i, move in enumerate(moves)]
+
+    # the workers stop at the deadline by themselves; a budget stopped from
+    # another thread is only seen here, and leaves them busy
+    result = pool.map_async(_search_root_move, tasks, chunksize=1)
+    try:
+	while not result.ready():
+	    result.wait(WAIT_STEP)
+	    if budget is not None and budget.stopped: raise SearchTimeout()
+	results = result.get()
+    except:
+	close_pool()
+	raise
+    if budget is not None:
+	budget.nodes += sum(result[1] for result in results if result is not None)
+    if None in results: raise SearchTimeout()
+
+    # pick the move exactly like alpha_beta_root does
+    best_move = None
+    for move, (score, nodes, seconds, counts) in zip(moves, results):
+	if stats is not None:
+	    _add_stats(stats, counts)
+	    stats.root_moves.append((move, score, seconds))
+	if score >= beta:                    # fails high, as in _search_root
+	    if tt is not None: tt.store(key, depth, LOWER, beta, move)
+	    if stats is not None:
+		stats.pv[1] = counts[5]
+		stats.improve(depth, move)
+		stats.end_iteration(move, beta)
+	    return move
+	if score > alpha:
+	    alpha, best_move = score, move
+	    if stats is not None:
+		stats.pv[1] = counts[5]
+		stats.improve(depth, move)
+
+    if tt is not None and best_move is not None:
+	tt.store(key, depth, EXACT, alpha, best_move)
+    if stats is not None: stats.end_iteration(best_move, alpha)
+    return best_move
+
+def close_pool():
+    "Terminate the worker processes of the kept pool, if any."
+
+    global _pool
+    if _pool is not None:
+	_pool.terminate()
+	_pool = None
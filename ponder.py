@@ -0,0 +1,140 @@
+#!/usr/bin/python
+
+"""Module ponder
+Pondering for Game Isolation: the engine searches on the opponent's time.
+
+While the opponent thinks, a background thread plays the reply it expects,
+and searches the resulting position with iterative deepening, as the
+engine's next search would. The search shares the transposition table and
+move ordering of the game, so when the expected reply is played, the next
+search finds them warmed up, and may even take the pondered move as it is.
+On any other reply, the ponder search is thrown away.
+
+Alternatively every reply can be pondered, one iteration at a time in
+turn: less deep, but never wrong.
+
+The opponent thinks while the main thread waits for input, with the
+interpreter lock released, so the ponder thread runs at full speed.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: ponder.py
+
+"""
+
+import threading
+
+from bitboard import BitBoard
+from algo import *
+from algo import _next_moves, _tt_key, _from_tt
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# the depth of the search predicting the reply, when the table knows none
+PREDICT_DEPTH = 2
+
+#=====================================================================#
+#                         Private Functions                           #
+#=====================================================================#
+
+def _predict(whose_ply, board, replies, tt):
+    '''Guess the reply of player whose_ply: the best move the table holds
+    for the position, as left by the engine's last search, or else the
+    best move of a shallow search.'''
+
+    if tt is not None:
+	# the position was searched as an interior node, keyed either way
+	for depth in (CANONICAL_DEPTH, 1):
+	    key, sym = _tt_key(whose_ply, board, depth)
+	    entry = tt.probe(key)
+	    if entry is not None and entry[4] is not None:
+		move = _from_tt(board, entry[4], sym)
+		if move in replies: return move
+    return alpha_beta_root(whose_ply, board, PREDICT_DEPTH, NEG_INFINITY,
+			   POS_INFINITY) or replies[0]
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+class Ponderer(object):
+    '''Class Ponderer
+
+    One ponder search, running in a background thread from start() until
+    stop(). The results are the best move found for each pondered reply,
+    with the depth of the deepest iteration completed.
+    '''
+
+    def __init__(self, whose_ply, board, tt=None, ordering=None, evaluate=hef,
+		 root=alpha_beta_root, all_replies=False):
+	'''
+	@whose_ply: the engine player, to move after the opponent's reply
+	@board: Board or BitBoard object reference, the opponent to move;
+		the ponder search runs on a copy
+	@tt: optional TranspositionTable, the one of the engine's searches
+	@ordering: optional MoveOrdering, the one of the engine's searches
+	@evaluate: the leaf evaluation function; same signature as hef
+	@root: the root search function, alpha_beta_root or pvs_root
+	@all_replies: ponder every reply instead of the expected one
+	'''
+
+	if isinstance(board, BitBoard): board = board.copy()
+	else:                           board = BitBoard.from_board(board)
+	self.whose_ply = whose_ply
+	self.board = board
+	self.tt = tt
+	self.ordering = ordering
+	self.evaluate = evaluate
+	self.root = root
+	self.all_replies = all_replies
+	self.budget = SearchBudget()
+	self.results = {}   # reply -> (depth, best move)
+	self.thread = None
+
+    def start(self):
+	"Start pondering in a background thread."
+
+	self.thread = threading.Thread(target=self._run)
+	self.thread.daemon = True
+	self.thread.start()
+
+    def stop(self, reply=None):
+	'''Stop pondering, and return the result for the reply played.
+
+	@reply: the move the opponent made, or None
+	@return: a tuple (depth, best move) if reply was pondered deep
+		 enough to complete an iteration, otherwise None
+	'''
+
+	self.budget.stop()
+	if self.thread is not None: self.thread.join()
+	return self.results.get(reply)
+
+    def _run(self):
+	"The ponder thread: iterative deepening over the pondered replies."
+
+	board, budget = self.board, self.budget
+	opponent = 'p1' if self.whose_ply == 'p2' else 'p2'
+	replies = _next_moves(opponent, board)
+	if not replies: return
+
+	try:
+	    if not self.all_replies:
+		replies = [_predict(opponent, board, replies, self.tt)]
+	    empty = board.n*board.n - bin(board.occupied).count('1') - 1
+	    for depth in xrange(1, empty+1):
+		for reply in replies:
+		    if budget.stopped: return
+		    best = self.results.get(reply, (0, None))[1]
+		    board.set_move(reply, opponent)
+		    try:
+			move = self.root(self.whose_ply, board, depth, NEG_INFINITY,
+					 POS_INFINITY, self.tt, budget, best, self.ordering,
+					 self.evaluate)
+		    finally:
+			board.delete_move(reply, opponent)
+		    self.results[reply] = (depth, move)
+	except SearchTimeout:
+	    pass
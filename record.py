@@ -0,0 +1,178 @@
+#!/usr/bin/python
+
+"""Module record
+Game records for Game Isolation: a compact binary format for archiving
+large numbers of games, with a writer and a streaming reader.
+
+A record file is the magic string followed by any number of records:
+
+    magic:   'ISOREC01'
+    header:  board length (1 byte), flags (1 byte), number of moves (2 bytes)
+    moves:   one square index (i*n + j) per move; 1 byte each on boards of
+	     up to 256 tiles, 2 bytes each on larger ones
+    stats:   if FLAG_STATS is set, per move: search depth (1 byte), nodes
+	     (4 bytes), score (2 bytes); all zero for moves not searched
+
+The flags give the player moving first and the winner. The moves start
+from the start position, the first player moving first and the players
+taking turns. All numbers are little-endian.
+
+The reader is a generator over the records of a file, reading one record
+at a time, so files of millions of games stream through in constant
+memory; replay() plays the records on one reused board per size, without
+building an object per game.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: record.py
+
+"""
+
+import sys
+import struct
+from array import array
+
+from bitboard import BitBoard
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+MAGIC = 'ISOREC01'
+HEADER = struct.Struct('<BBH')   # board length, flags, number of moves
+STATS = struct.Struct('<BIh')    # depth, nodes, score
+
+# header flags
+FLAG_FIRST_P2 = 1    # p2 moved first
+FLAG_WINNER_P1 = 2   # p1 won
+FLAG_WINNER_P2 = 4   # p2 won
+FLAG_STATS = 8       # the moves come with search statistics
+
+# the longest game a record holds
+MAX_MOVES = 0xffff
+
+#=====================================================================#
+#                         Private Functions                           #
+#=====================================================================#
+
+def _move_type(size):
+    "Return the array type code of the moves of a board of length 'size'."
+    return 'B' if size*size <= 256 else 'H'
+
+def _read(f, count):
+    "Read exactly count bytes from f; raise ValueError on a short read."
+
+    data = f.read(count)
+    if len(data) != count: raise ValueError('truncated game record')
+    return data
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+class RecordWriter(object):
+    '''Class RecordWriter
+
+    Appends game records to a file. A new or empty file gets the magic
+    string first; to an existing record file the records are appended.
+    '''
+
+    def __init__(self, f):
+	'''
+	@f: a file opened for binary writing, e.g. open(path, 'ab')
+	'''
+
+	self.file = f
+	f.seek(0, 2)
+	if f.tell() == 0: f.write(MAGIC)
+	self.count = 0
+
+    def write(self, size, first, moves, winner=None, stats=None):
+	'''Write one game record.
+
+	--- Function Arguments ---
+	@size: the board length
+	@first: the player moving first; either 'p1' or 'p2'
+	@moves: the moves played, as (row, column) tuples
+	@winner: 'p1', 'p2', or None if the game was not finished
+	@stats: optional list of (depth, nodes, score) tuples or None, one
+		per move; None for the moves not searched
+	'''
+
+	if len(moves) > MAX_MOVES: raise ValueError('too many moves for a game record')
+	flags = FLAG_FIRST_P2 if first == 'p2' else 0
+	if winner == 'p1':   flags |= FLAG_WINNER_P1
+	elif winner == 'p2': flags |= FLAG_WINNER_P2
+	if stats is not None and any(stats): flags |= FLAG_STATS
+
+	squares = array(_move_type(size), [i*size + j for i, j in moves])
+	if sys.byteorder == 'big': squares.byteswap()
+	chunks = [HEADER.pack(size, flags, len(moves)), squares.tostring()]
+	if flags & FLAG_STATS:
+	    for stat in stats:
+		depth, nodes, score = stat or (0, 0, 0)
+		chunks.append(STATS.pack(min(depth, 0xff), min(nodes, 0xffffffff),
+					 int(round(score))))
+	self.file.write(''.join(chunks))
+	self.count += 1
+
+    def flush(self):
+	self.file.flush()
+
+    def close(self):
+	self.file.close()
+
+def read_records(f):
+    '''Generate the records of a record file, one at a time.
+
+    @f: a file opened for binary reading, positioned at the magic string
+    @return: a generator of tuples (size, first, winner, squares, stats):
+	     'squares' is an array of the square indices of the moves,
+	     'stats' a list of (depth, nodes, score) tuples or None
+    @raise: ValueError if f is not a record file, or is truncated
+    '''
+
+    if f.read(len(MAGIC)) != MAGIC: raise ValueError('not a game record file')
+    while True:
+	header = f.read(HEADER.size)
+	if not header: return
+	if len(header) != HEADER.size: raise ValueError('truncated game record')
+	size, flags, count = HEADER.unpack(header)
+
+	squares = array(_move_type(size))
+	squares.fromstring(_read(f, count * squares.itemsize))
+	if sys.byteorder == 'big': squares.byteswap()
+	stats = None
+	if flags & FLAG_STATS:
+	    data = _read(f, count * STATS.size)
+	    stats = [STATS.unpack_from(data, k*STATS.size) for k in xrange(count)]
+
+	first = 'p2' if flags & FLAG_FIRST_P2 else 'p1'
+	winner = 'p1' if flags & FLAG_WINNER_P1 else 'p2' if flags & FLAG_WINNER_P2 else None
+	yield size, first, winner, squares, stats
+
+def replay(records):
+    '''Play records back, move by move, on one board per board size.
+
+    For every move it generates the position before the move; the move is
+    played on the board once the consumer asks for the next one, so the
+    board must not be changed in between. The boards are reused from one
+    record to the next; copy one to keep it.
+
+    @records: game records, e.g. read_records(f)
+    @return: a generator of tuples (game index, board, who, move, stats):
+	     'who' moves 'move' on 'board'; 'stats' is the (depth, nodes,
+	     score) of the move, or None
+    '''
+
+    boards = {}
+    for index, (size, first, winner, squares, stats) in enumerate(records):
+	board = boards.get(size)
+	if board is None: board = boards[size] = BitBoard(size)
+	board.clear_board()
+	coords, who = board.coords, first
+	for ply, sq in enumerate(squares):
+	    move = coords[sq]
+	    yield index, board, who, move, stats and stats[ply]
+	    board.set_move(move, who)
+	    who = 'p1' if who == 'p2' else 'p2'
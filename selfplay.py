@@ -0,0 +1,228 @@
+#!/usr/bin/python
+
+"""Module selfplay
+Headless batch runner playing engine-vs-engine games of Isolation on a pool
+of worker processes.
+
+Every finished game is written to stdout as one JSON line (winner, moves,
+nodes and seconds per move); a summary with games/sec and nodes/sec goes to
+stderr at the end. With --record, the games are also appended to a binary
+game record file (see module record).
+
+Usage: python selfplay.py [-n GAMES] [-j PROCESSES] [--a-depth N] [--b-time S] ...
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: selfplay.py
+
+"""
+
+import sys
+import time
+import json
+import random
+import argparse
+import multiprocessing
+
+from bitboard import BitBoard
+from ttable import TranspositionTable
+from record import RecordWriter
+from mcts import MonteCarlo
+from algo import *
+from algo import _next_moves
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# search algorithms a Player can use, by name; the depth of a Player sets
+# the playouts of 'mcts' (see module mcts)
+ALGORITHMS = {'alphabeta': alpha_beta_root, 'pvs': pvs_root, 'mcts': MonteCarlo()}
+
+# leaf evaluation functions a Player can use, by name
+HEURISTICS = EVALUATORS
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+class Player(object):
+    '''Class Player
+
+    The engine configuration of one side: the search algorithm, a fixed
+    depth or a time budget per move, and the leaf evaluation function.
+    '''
+
+    def __init__(self, algorithm='alphabeta', depth=6, time_limit=None, heuristic='hef'):
+	'''
+	@algorithm: a key of ALGORITHMS
+	@depth: the search depth, used if time_limit is not given
+	@time_limit: seconds per move; searches with iterative deepening
+	@heuristic: a key of HEURISTICS
+	'''
+
+	if algorithm not in ALGORITHMS: raise ValueError('unknown algorithm: %s' % algorithm)
+	if heuristic not in HEURISTICS: raise ValueError('unknown heuristic: %s' % heuristic)
+	self.algorithm = algorithm
+	self.depth = depth
+	self.time_limit = time_limit
+	self.heuristic = heuristic
+	self.tt = self.ordering = None
+
+    def __str__(self):
+	budget = 'time=%gs' % self.time_limit if self.time_limit else 'depth=%d' % self.depth
+	return '%s/%s/%s' % (self.algorithm, budget, self.heuristic)
+
+    def new_game(self):
+	"Reset the search state kept from move to move."
+	self.tt = TranspositionTable(1 << 18)
+	self.ordering = MoveOrdering()
+
+    def search(self, whose_ply, board):
+	'''Find the move to play.
+
+	@whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+	@board: a BitBoard object reference
+	@return: a tuple (move or None, number of nodes searched)
+	'''
+
+	evaluate = HEURISTICS[self.heuristic]
+	if self.time_limit:
+	    budget = SearchBudget(self.time_limit)
+	    move = iterative_deepening(whose_ply, board, None, tt=self.tt, ordering=self.ordering,
+				       evaluate=evaluate, budget=budget,
+				       root=ALGORITHMS[self.algorithm])
+	else:
+	    budget = SearchBudget()
+	    move = ALGORITHMS[self.algorithm](whose_ply, board, self.depth, NEG_INFINITY,
+					      POS_INFINITY, tt=self.tt, budget=budget,
+					      ordering=self.ordering, evaluate=evaluate)
+	return move, budget.nodes
+
+def play_game(task):
+    '''Play one game; run in a worker process.
+
+    @task: a tuple (index, player p1, player p2, opening plies, seed)
+    @return: a dictionary describing the game
+    '''
+
+    index, p1, p2, opening_plies, seed = task
+    players = {'p1': p1, 'p2': p2}
+    p1.new_game()
+    p2.new_game()
+
+    board, who = BitBoard(), 'p1'
+    moves, nodes, times = [], [], []
+
+    # random opening plies, so that the games differ from each other
+    rng = random.Random(seed + index)
+    for ply in xrange(opening_plies):
+	replies = _next_moves(who, board)
+	if not replies: break
+	move = rng.choice(replies)
+	board.set_move(move, who)
+	moves.append(move)
+	nodes.append(0)
+	times.append(0.0)
+	who = 'p1' if who == 'p2' else 'p2'
+
+    while True:
+	start = time.time()
+	move, count = players[who].search(who, board)
+	if move is None: break   # no moves left, or the engine knows it loses
+	board.set_move(move, who)
+	moves.append(move)
+	nodes.append(count)
+	times.append(round(time.time() - start, 6))
+	who = 'p1' if who == 'p2' else 'p2'
+
+    return {'game': index, 'p1': str(p1), 'p2': str(p2), 'size': board.n,
+	    'winner': 'p1' if who == 'p2' else 'p2',
+	    'moves': moves, 'nodes': nodes, 'times': times}
+
+def run(player_a, player_b, games, processes=None, opening_plies=2, seed=0,
+	alternate=False, out=sys.stdout, record=None):
+    '''Play a batch of games and stream the results as JSON lines.
+
+    --- Function Arguments ---
+    @player_a: the Player moving first (as p1)
+    @player_b: the Player moving second (as p2)
+    @games: the number of games to play
+    @processes: the number of worker processes; defaults to the number of CPUs
+    @opening_plies: random plies played before the engines take over
+    @seed: the seed of the random openings
+    @alternate: swap sides on every other game
+    @out: the file the results are written to
+    @record: optional RecordWriter the games are also written to, with the
+	     nodes of every searched move (the depth and score are left 0)
+    @return: a dictionary of totals: games, wins of player a and b, nodes, seconds
+    '''
+
+    tasks = []
+    for i in xrange(games):
+	if alternate and i % 2: tasks.append((i, player_b, player_a, opening_plies, seed))
+	else:                   tasks.append((i, player_a, player_b, opening_plies, seed))
+
+    totals = {'games': 0, 'wins': {'a': 0, 'b': 0}, 'nodes': 0}
+    start = time.time()
+    pool = multiprocessing.Pool(processes)
+    try:
+	for result in pool.imap_unordered(play_game, tasks):
+	    out.write(json.dumps(result) + '\n')
+	    out.flush()
+	    if record is not None:
+		record.write(result['size'], 'p1', result['moves'], result['winner'],
+			     [(0, count, 0) if count else None for count in result['nodes']])
+	    totals['games'] += 1
+	    totals['nodes'] += sum(result['nodes'])
+	    swapped = alternate and result['game'] % 2
+	    totals['wins']['a' if (result['winner'] == 'p1') != swapped else 'b'] += 1
+    finally:
+	pool.terminate()
+    totals['seconds'] = time.time() - start
+    return totals
+
+def _add_player_arguments(parser, side):
+    "Add the options configuring Player 'side' ('a' or 'b') to parser."
+
+    parser.add_argument('--%s-algo' % side, default='alphabeta', choices=sorted(ALGORITHMS),
+			help='search algorithm of player %s' % side)
+    parser.add_argument('--%s-depth' % side, type=int, default=6,
+			help='search depth of player %s' % side)
+    parser.add_argument('--%s-time' % side, type=float, default=None,
+			help='seconds per move of player %s (overrides depth)' % side)
+    parser.add_argument('--%s-heuristic' % side, default='hef', choices=sorted(HEURISTICS),
+			help='leaf evaluation of player %s' % side)
+
+def main():
+    parser = argparse.ArgumentParser(description='Play engine-vs-engine games of Isolation.')
+    parser.add_argument('-n', '--games', type=int, default=10, help='number of games')
+    parser.add_argument('-j', '--processes', type=int, default=None,
+			help='worker processes (default: number of CPUs)')
+    parser.add_argument('--opening-plies', type=int, default=2,
+			help='random plies before the engines take over')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random openings')
+    parser.add_argument('--alternate', action='store_true',
+			help='swap sides on every other game')
+    parser.add_argument('--record', metavar='FILE',
+			help='append the games to a binary game record file')
+    _add_player_arguments(parser, 'a')
+    _add_player_arguments(parser, 'b')
+    args = parser.parse_args()
+
+    player_a = Player(args.a_algo, args.a_depth, args.a_time, args.a_heuristic)
+    player_b = Player(args.b_algo, args.b_depth, args.b_time, args.b_heuristic)
+    record = args.record and RecordWriter(open(args.record, 'ab'))
+    try:
+	totals = run(player_a, player_b, args.games, args.processes, args.opening_plies,
+		     args.seed, args.alternate, record=record)
+    finally:
+	if record: record.close()
+
+    seconds = totals['seconds'] or 1e-9
+    print >> sys.stderr, '%d games in %.2fs: %.2f games/sec, %.0f nodes/sec' % (
+	totals['games'], seconds, totals['games'] / seconds, totals['nodes'] / seconds)
+    for side, player in (('a', player_a), ('b', player_b)):
+	print >> sys.stderr, '  %s %-36s %d wins' % (side, player, totals['wins'][side])
+
+if __name__ == '__main__': main()
@@ -0,0 +1,382 @@
+#!/usr/bin/python
+
+"""Module server
+Game server for Game Isolation: clients play against the engine over a
+local TCP socket, one JSON object per line in each direction.
+
+Requests (the optional "id" is echoed back in the reply):
+
+    {"op": "new", "engine_first": true}        start a game; engine is p1
+    {"op": "move", "game": 1, "move": [3, 4]}  play a move; the engine replies
+    {"op": "resign", "game": 1}                give the game up
+    {"op": "state", "game": 1}                 report the game
+
+Replies are {"ok": true, ...game state...} or {"ok": false, "error": ...}.
+The game state lists the client's legal moves while it is its turn. A new
+game may give the board length as "size", from MIN_SIZE to MAX_SIZE; the
+default is 8.
+
+Every connection is served by its own thread, and the games belong to the
+connection that started them. The engine searches run in a bounded pool
+of worker processes, so a deep search never stalls the other games. Each
+search has a deadline: it is given a time budget to fit in, and a reply
+not back by then is reported as an error and the move taken back. When
+every worker is busy and MAX_PENDING searches are queued, new moves are
+turned away with a 'busy' error instead of queueing up without bound.
+
+Usage: python server.py [--port PORT] [-j PROCESSES] [--move-time S] [--deadline S]
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: server.py
+
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import multiprocessing
+import SocketServer
+
+from game import Game
+from ttable import TranspositionTable
+from book import open_book
+from tablebase import open_tablebase
+from moves import legal_moves
+from algo import *
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+HOST = '127.0.0.1'
+PORT = 7070
+
+# default search time per engine move, and the deadline of a move request
+MOVE_TIME = 1.0
+DEADLINE = 5.0
+
+# searches allowed to wait for a worker, per worker process
+QUEUE_PER_WORKER = 2
+
+# the part of the time left to the deadline a search may use; the rest
+# covers the trip to the worker and back
+SEARCH_SHARE = 0.8
+
+# games a single connection may keep open
+MAX_GAMES = 64
+
+# the board lengths a game may be started with
+MIN_SIZE, MAX_SIZE = 3, 16
+
+#=====================================================================#
+#                         Worker Processes                            #
+#=====================================================================#
+
+# the transposition table of a worker, shared by all games it searches
+_tt = None
+
+def _init_worker():
+    '''Pool initializer: give the worker a transposition table of its own,
+    and the endgame tablebase if there is one.'''
+    global _tt
+    _tt = TranspositionTable(1 << 18)
+    use_tablebase(open_tablebase())
+
+def _search(task):
+    '''Find the engine move; run in a worker process.
+
+    @task: a tuple (whose_ply, board, time_limit)
+    @return: a tuple (move or None, error message or None)
+    '''
+
+    whose_ply, board, time_limit = task
+    try:
+	book = open_book()
+	move = book and book.lookup(whose_ply, board)
+	if not move:
+	    move = iterative_deepening(whose_ply, board, time_limit, tt=_tt,
+				       ordering=MoveOrdering())
+	return move, None
+    except Exception, e:
+	return None, '%s: %s' % (e.__class__.__name__, e)
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+class Engine(object):
+    '''Class Engine
+
+    The pool of worker processes searching the engine moves of all games,
+    with a bounded number of searches in flight.
+    '''
+
+    def __init__(self, processes=None, move_time=MOVE_TIME, max_pending=None):
+	'''
+	@processes: the number of worker processes; defaults to the number of CPUs
+	@move_time: the search time per move, if the deadline leaves that much
+	@max_pending: searches allowed in flight, running or queued
+	'''
+
+	processes = processes or multiprocessing.cpu_count()
+	self.move_time = move_time
+	self.pool = multiprocessing.Pool(processes, _init_worker)
+	self.slots = threading.BoundedSemaphore(max_pending or processes*(1 + QUEUE_PER_WORKER))
+
+    def search(self, whose_ply, board, deadline):
+	'''Search the move of player whose_ply in a worker process.
+
+	--- Function Arguments ---
+	@whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+	@board: a BitBoard object reference; it is copied to the worker
+	@deadline: the time (as time.time()) the move must be found by
+	@return: the move, or None if the engine has none
+	@raise: EngineError if the pool is saturated or the deadline is missed
+	'''
+
+	if not self.slots.acquire(False): raise EngineError('busy')
+	left = deadline - time.time()
+	if left <= 0:
+	    self.slots.release()
+	    raise EngineError('deadline exceeded')
+
+	# the slot is given back when the worker is done, even if nobody
+	# waits for the result any more
+	done = lambda result: self.slots.release()
+	task = (whose_ply, board, min(self.move_time, left * SEARCH_SHARE))
+	result = self.pool.apply_async(_search, (task,), callback=done)
+	try:
+	    move, error = result.get(left)
+	except multiprocessing.TimeoutError:
+	    raise EngineError('deadline exceeded')
+	if error: raise EngineError(error)
+	return move
+
+    def close(self):
+	"Stop the worker processes."
+	self.pool.terminate()
+	self.pool.join()
+
+class EngineError(Exception):
+    "Raised by Engine.search when no move could be found in time."
+    pass
+
+class Session(SocketServer.StreamRequestHandler):
+    '''Class Session
+
+    Serves one client connection: reads request lines, and writes one
+    reply line for each. The engine always plays p1, the client p2.
+    '''
+
+    def setup(self):
+	SocketServer.StreamRequestHandler.setup(self)
+	self.games = {}
+	self.next_game = 1
+
+    def handle(self):
+	for line in iter(self.rfile.readline, ''):
+	    if not line.strip(): continue
+	    try:
+		request = json.loads(line)
+		if not isinstance(request, dict): raise ValueError('not an object')
+	    except ValueError, e:
+		reply = {'ok': False, 'error': 'bad request: %s' % e}
+	    else:
+		reply = self.dispatch(request)
+		if 'id' in request: reply['id'] = request['id']
+	    self.wfile.write(json.dumps(reply) + '\n')
+	    self.wfile.flush()
+
+    def dispatch(self, request):
+	'''Carry out one request.
+
+	@request: the decoded request object
+	@return: the reply object
+	'''
+
+	op = request.get('op')
+	handler = getattr(self, 'op_%s' % op, None) if isinstance(op, basestring) else None
+	if handler is None: return {'ok': False, 'error': 'unknown op: %s' % op}
+
+	try:
+	    deadline = time.time() + float(request.get('deadline', self.server.deadline))
+	    if op == 'new': return handler(request, deadline)
+	    gid = request.get('game')
+	    if gid not in self.games: return {'ok': False, 'error': 'no such game'}
+	    return handler(gid, request, deadline)
+	except EngineError, e:
+	    return {'ok': False, 'error': str(e)}
+	except (TypeError, ValueError), e:
+	    return {'ok': False, 'error': 'bad request: %s' % e}
+
+    def op_new(self, request, deadline):
+	"Start a game; the engine makes its first move if it goes first."
+
+	if len(self.games) >= MAX_GAMES: return {'ok': False, 'error': 'too many games'}
+	size = int(request.get('size', 8))
+	if not MIN_SIZE <= size <= MAX_SIZE: return {'ok': False, 'error': 'bad size'}
+	game = Game(size=size)
+	game.pc_first = bool(request.get('engine_first', True))
+	game.cur_turn = 'p1' if game.pc_first else 'p2'
+	if game.pc_first:
+	    self.engine_moves(game, deadline)
+	elif not legal_moves('p2', game.board):
+	    game.gameover, game.winner = True, 'p1'
+	gid, self.next_game = self.next_game, self.next_game + 1
+	self.games[gid] = game
+	return self.state(gid)
+
+    def op_move(self, gid, request, deadline):
+	"Play the client's move, then the engine's reply."
+
+	game = self.games[gid]
+	if game.gameover: return {'ok': False, 'error': 'game over'}
+	if game.cur_turn != 'p2': return {'ok': False, 'error': 'not your turn'}
+	try:
+	    move = tuple(int(x) for x in request['move'])
+	except (KeyError, TypeError, ValueError):
+	    return {'ok': False, 'error': 'bad move'}
+	if len(move) != 2 or not game.is_valid_move(move):
+	    return {'ok': False, 'error': 'illegal move'}
+
+	game.make_move(move)   # it is the engine's turn now
+	try:
+	    self.engine_moves(game, deadline)
+	except EngineError:
+	    # take the move back, so that the client can send it again
+	    game.board.delete_move(move, 'p2')
+	    game.moves.pop()
+	    game.cur_turn = 'p2'
+	    game.nom -= 1
+	    raise
+	return self.state(gid)
+
+    def op_resign(self, gid, request, deadline):
+	"Give the game up."
+
+	game = self.games[gid]
+	if not game.gameover: game.gameover, game.winner = True, 'p1'
+	return self.state(gid)
+
+    def op_state(self, gid, request, deadline):
+	"Report the game."
+	return self.state(gid)
+
+    def engine_moves(self, game, deadline):
+	"Let the engine (p1) move, and check if either side is out of moves."
+
+	move = self.server.engine.search('p1', game.board, deadline)
+	if move is None:
+	    game.gameover, game.winner = True, 'p2'
+	    return
+	game.make_move(move)
+	game.cur_turn = 'p2'
+	if not legal_moves('p2', game.board):
+	    game.gameover, game.winner = True, 'p1'
+
+    def state(self, gid):
+	"Return the reply describing game gid."
+
+	game = self.games[gid]
+	board = game.board.get_board()
+	mined = [(i, j) for i, row in enumerate(board) for j, tile in enumerate(row) if tile]
+	return {'ok': True, 'game': gid, 'turn': game.cur_turn, 'over': game.gameover,
+		'winner': game.winner if game.gameover else None,
+		'p1': game.board.get_position('p1'), 'p2': game.board.get_position('p2'),
+		'mined': mined,
+		'moves': sorted(legal_moves('p2', game.board))
+			 if game.cur_turn == 'p2' and not game.gameover else []}
+
+class Server(SocketServer.ThreadingTCPServer):
+    '''Class Server
+
+    The TCP server; owns the engine shared by all connections.
+    '''
+
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, engine, deadline=DEADLINE):
+	'''
+	@address: the (host, port) to listen on; port 0 picks a free one
+	@engine: the Engine searching the moves
+	@deadline: seconds a request may take, unless it says otherwise
+	'''
+
+	SocketServer.ThreadingTCPServer.__init__(self, address, Session)
+	self.engine = engine
+	self.deadline = deadline
+
+    def start(self):
+	"Serve in a background thread; return the thread."
+
+	thread = threading.Thread(target=self.serve_forever)
+	thread.daemon = True
+	thread.start()
+	return thread
+
+    def close(self):
+	"Stop serving, and stop the engine."
+
+	self.shutdown()
+	self.server_close()
+	self.engine.close()
+
+class Client(object):
+    '''Class Client
+
+    A blocking client of the server, e.g. for tests run in the same process
+    as the server:
+
+	server = Server((HOST, 0), Engine(2)); server.start()
+	client = Client(server.server_address)
+	game = client.request(op='new', engine_first=False)['game']
+    '''
+
+    def __init__(self, address=(HOST, PORT), timeout=None):
+	self.sock = socket.create_connection(address, timeout)
+	self.rfile = self.sock.makefile('rb')
+
+    def request(self, **fields):
+	"Send one request and return the reply."
+
+	self.sock.sendall(json.dumps(fields) + '\n')
+	line = self.rfile.readline()
+	if not line: raise EOFError('connection closed by server')
+	return json.loads(line)
+
+    def close(self):
+	self.rfile.close()
+	self.sock.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve games of Isolation over TCP.')
+    parser.add_argument('--host', default=HOST, help='address to listen on')
+    parser.add_argument('--port', type=int, default=PORT, help='port to listen on')
+    parser.add_argument('-j', '--processes', type=int, default=None,
+			help='search worker processes (default: number of CPUs)')
+    parser.add_argument('--move-time', type=float, default=MOVE_TIME,
+			help='search time per engine move')
+    parser.add_argument('--deadline', type=float, default=DEADLINE,
+			help='seconds a request may take by default')
+    parser.add_argument('--max-pending', type=int, default=None,
+			help='searches in flight before moves are turned away')
+    args = parser.parse_args()
+
+    engine = Engine(args.processes, args.move_time, args.max_pending)
+    server = Server((args.host, args.port), engine, args.deadline)
+    print >> sys.stderr, 'serving on %s:%d' % server.server_address
+    try:
+	server.serve_forever()
+    except KeyboardInterrupt:
+	pass
+    finally:
+	server.server_close()
+	engine.close()
+
+if __name__ == '__main__': main()
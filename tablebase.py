@@ -0,0 +1,364 @@
+#!/usr/bin/python
+
+"""Module tablebase
+Endgame tablebase for Game Isolation: an offline generator, and a reader
+probing the tablebase file through mmap.
+
+Only the empty tiles the pawns can still reach matter to the outcome of a
+game: every other tile might as well be mined, and so might everything
+beyond the edges of the board. A position is therefore a pattern of tiles,
+the pawns' combined region plus the two pawns, wherever it lies on a board
+of any size. Patterns are keyed canonically: translated into the corner of
+a grid and taken in the least of their 8 mirror images, so one record
+serves every copy of a pattern.
+
+The generator enumerates every connected pattern with up to max_empty
+empty tiles, with every placement of the two pawns, and solves it
+backwards from the positions in which the player to move is stuck: each
+move mines a tile, so the value of a position follows from the values of
+positions with fewer empty tiles. Positions reached on the way in which
+the pawns got separated are kept as well. A value is the winner and the
+number of plies to the end of the game with best play: the winner ends
+the game as fast as he can, the loser holds out as long as he can.
+
+The tablebase file is a header followed by fixed-size records sorted by
+key:
+
+    header: magic 'ISOTBAS1', max_empty (1 byte), record count (4 bytes)
+    record: canonical key (big-endian, size set by max_empty), value (1 byte)
+
+Usage: python tablebase.py [-e MAX_EMPTY] [TABLEBASE_FILE]
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: tablebase.py
+
+"""
+
+import os
+import mmap
+import struct
+import argparse
+
+from bitboard import BitBoard
+from endgame import _get_masks, _flood, _moves
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+MAGIC = 'ISOTBAS1'
+HEADER = struct.Struct('<8sBI')   # magic, max_empty, record count
+
+# value byte: the player to move wins if WIN is set; the rest is the number
+# of plies to the end of the game
+WIN = 0x80
+PLIES = 0x7f
+
+# the default number of empty tiles in the pawns' region covered
+MAX_EMPTY = 6
+
+# positions with more empty tiles than this on the whole board are not
+# probed: finding the pawns' region would cost more than the probes save
+PROBE_EMPTY = 16
+
+# the probe results cached by position hash are dropped once there are
+# more than this
+MAX_CACHE = 1 << 16
+
+# the tablebase probed by the game program and the server workers
+TABLEBASE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebase.bin')
+
+# the 8 symmetries of the square: (row, column) -> (a*row + b*column, c*row + d*column)
+_SYMMETRIES = ((1, 0, 0, 1), (1, 0, 0, -1), (-1, 0, 0, 1), (-1, 0, 0, -1),
+	       (0, 1, 1, 0), (0, 1, -1, 0), (0, -1, 1, 0), (0, -1, -1, 0))
+
+# tablebases opened by open_tablebase, by path; shared by all games of a process
+_tablebases = {}
+
+# the 8 mirror images of a pattern's bounding box, by (height, width, grid width)
+_frames = {}
+
+#=====================================================================#
+#                         Private Functions                           #
+#=====================================================================#
+
+def _layout(max_empty):
+    '''Return the key layout of a tablebase covering max_empty empty tiles:
+    a tuple (grid width, bits per pawn tile, key bytes). A connected
+    pattern of max_empty+2 tiles always fits in a grid that wide.'''
+
+    width = max_empty + 2
+    bits = (width*width - 1).bit_length()
+    return width, bits, (width*width + 2*bits + 7) // 8
+
+def _tiles(mask, n):
+    "Return the (row, column) tuples of the tiles in mask, on a board of length n."
+
+    tiles = []
+    while mask:
+	low = mask & -mask
+	tiles.append(divmod(low.bit_length() - 1, n))
+	mask ^= low
+    return tiles
+
+def _get_frames(height, width, grid):
+    '''Return the mirror images of a height x width box in the corner of a
+    grid x grid grid: 8 tuples mapping every tile index i*grid + j of the
+    box to its index in the image.'''
+
+    if (height, width, grid) not in _frames:
+	frames = []
+	for a, b, c, d in _SYMMETRIES:
+	    top = min(a*i + b*j for i in (0, height-1) for j in (0, width-1))
+	    left = min(c*i + d*j for i in (0, height-1) for j in (0, width-1))
+	    index = [0] * (grid*grid)
+	    for i in xrange(height):
+		for j in xrange(width):
+		    index[i*grid + j] = (a*i + b*j - top)*grid + c*i + d*j - left
+	    frames.append(tuple(index))
+	_frames[height, width, grid] = frames
+    return _frames[height, width, grid]
+
+def _key(tiles, mover, other, width, bits):
+    '''Return the canonical key of a pattern.
+
+    --- Function Arguments ---
+    @tiles: the tiles of the pattern, pawns included, as (row, column) tuples
+    @mover: the tile of the pawn to move
+    @other: the tile of the other pawn
+    @width: the grid width of the keys
+    @bits: the bits per pawn tile of the keys
+    @return: the least key over the 8 mirror images, or None if the
+	     pattern does not fit in the grid
+    '''
+
+    rows, cols = [i for i, j in tiles], [j for i, j in tiles]
+    top, left = min(rows), min(cols)
+    height, across = max(rows) - top + 1, max(cols) - left + 1
+    if height > width or across > width: return None
+
+    # the tiles in the corner of the grid, then in every mirror image
+    tiles = [(i-top)*width + j-left for i, j in tiles]
+    mover = (mover[0]-top)*width + mover[1]-left
+    other = (other[0]-top)*width + other[1]-left
+    best = None
+    for index in _get_frames(height, across, width):
+	mask = 0
+	for tile in tiles: mask |= 1 << index[tile]
+	key = (mask << bits | index[mover]) << bits | index[other]
+	if best is None or key < best: best = key
+    return best
+
+def _encode(key, size):
+    "Return key as a big-endian string of 'size' bytes; sorts like the number."
+    return ('%0*x' % (2*size, key)).decode('hex')
+
+def _normalize(tiles):
+    "Return the least of the 8 mirror images of a set of tiles, in the corner."
+
+    best = None
+    for a, b, c, d in _SYMMETRIES:
+	moved = [(a*i + b*j, c*i + d*j) for i, j in tiles]
+	top, left = min(i for i, j in moved), min(j for i, j in moved)
+	moved = tuple(sorted((i-top, j-left) for i, j in moved))
+	if best is None or moved < best: best = moved
+    return best
+
+def _patterns(size):
+    '''Generate the sets of 2 to 'size' tiles connected in the 8 directions,
+    one per symmetry class, as tuples of (row, column) tuples.'''
+
+    level = set([((0, 0),)])
+    for count in xrange(2, size+1):
+	grown = set()
+	for tiles in level:
+	    for i, j in tiles:
+		for tile in ((i-1, j-1), (i-1, j), (i-1, j+1), (i, j-1),
+			     (i, j+1), (i+1, j-1), (i+1, j), (i+1, j+1)):
+		    if tile not in tiles: grown.add(_normalize(tiles + (tile,)))
+	level = grown
+	for tiles in level: yield tiles
+
+def _solve(empty, mover, other, board, layout, values):
+    '''Return the value byte of a position on the generator's board, from
+    the values of the positions after each move; memoized in 'values'.
+
+    --- Function Arguments ---
+    @empty: the mask of empty tiles
+    @mover: the square of the pawn to move
+    @other: the square of the other pawn
+    @board: a BitBoard object reference; supplies the ray tables
+    @layout: the key layout, see _layout
+    @values: canonical key -> value byte, of the positions solved so far
+    '''
+
+    bits, n = board.bits, board.n
+    region = _flood(bits[mover], empty, n) | _flood(bits[other], empty, n)
+    key = _key(_tiles(region | bits[mover] | bits[other], n), board.coords[mover],
+	       board.coords[other], layout[0], layout[1])
+    value = values.get(key)
+    if value is not None: return value
+
+    win, loss = None, None
+    for move in _moves(mover, region, board):
+	child = _solve(region ^ bits[move], other, move, board, layout, values)
+	plies = (child & PLIES) + 1
+	if child & WIN:                    # the opponent wins after this move
+	    if loss is None or plies > loss: loss = plies
+	elif win is None or plies < win:
+	    win = plies
+    value = values[key] = (WIN | win) if win is not None else (loss or 0)
+    return value
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+class Tablebase(object):
+    '''Class Tablebase
+
+    A read-only endgame tablebase. The file is memory-mapped and searched
+    in place with a binary search, so opening a tablebase parses nothing.
+    '''
+
+    def __init__(self, path=TABLEBASE_FILE, probe_empty=PROBE_EMPTY):
+	'''
+	@path: the tablebase file written by build_tablebase
+	@probe_empty: the most empty tiles on the board a probe looks at
+	'''
+
+	self.file = open(path, 'rb')
+	self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+	magic, self.max_empty, self.count = HEADER.unpack_from(self.data, 0)
+	self.width, self.bits, self.key_size = _layout(self.max_empty)
+	self.record_size = self.key_size + 1
+	if magic != MAGIC or len(self.data) != HEADER.size + self.count*self.record_size:
+	    self.close()
+	    raise ValueError('%s is not an endgame tablebase' % path)
+	self.probe_empty = max(probe_empty, self.max_empty)
+	self.cache = {}   # BitBoard hash -> probe result; searches probe alike
+			  # positions over and over
+
+    def __len__(self):
+	"Return the number of positions in the tablebase."
+	return self.count
+
+    def find(self, key):
+	'''Binary-search the tablebase for an encoded canonical key.
+
+	@key: the key, encoded by _encode
+	@return: the value byte, or None if the position misses
+	'''
+
+	data, size, low, high = self.data, self.key_size, 0, self.count
+	while low < high:
+	    mid = (low + high) // 2
+	    offset = HEADER.size + mid*self.record_size
+	    mid_key = data[offset:offset+size]
+	    if mid_key == key: return ord(data[offset+size])
+	    if mid_key < key: low = mid + 1
+	    else:             high = mid
+	return None
+
+    def probe(self, whose_ply, board):
+	'''Look the position up, for player whose_ply to move.
+
+	--- Function Arguments ---
+	@whose_ply: either 'p1' or 'p2'; current-ply player to make the move
+	@board: Board or BitBoard object reference
+	@return: a tuple (True if whose_ply wins, plies to the end of the
+		 game), or None if the position is not in the tablebase
+	'''
+
+	n, occupied = board.size+1, board.occupied
+	if n*n - bin(occupied).count('1') > self.probe_empty: return None
+	if not isinstance(board, BitBoard): return self._probe(whose_ply, board)
+
+	key = board.get_hash(whose_ply)
+	if key in self.cache: return self.cache[key]
+	if len(self.cache) >= MAX_CACHE: self.cache.clear()
+	result = self.cache[key] = self._probe(whose_ply, board)
+	return result
+
+    def _probe(self, whose_ply, board):
+	"Look the position up in the file; the body of probe()."
+
+	n, occupied = board.size+1, board.occupied
+	opponent = 'p1' if whose_ply == 'p2' else 'p2'
+	pos, pos_oppt = board.get_position(whose_ply), board.get_position(opponent)
+	mover, other = board.bits[pos[0]*n + pos[1]], board.bits[pos_oppt[0]*n + pos_oppt[1]]
+	empty = ~occupied & _get_masks(n)[0]
+	region = _flood(mover, empty, n)
+	if bin(region).count('1') > self.max_empty: return None
+	region |= _flood(other, empty, n)
+	if bin(region).count('1') > self.max_empty: return None
+
+	key = _key(_tiles(region | mover | other, n), pos, pos_oppt, self.width, self.bits)
+	value = None if key is None else self.find(_encode(key, self.key_size))
+	if value is None: return None
+	return bool(value & WIN), value & PLIES
+
+    def close(self):
+	"Unmap and close the tablebase file."
+	self.data.close()
+	self.file.close()
+
+def open_tablebase(path=TABLEBASE_FILE):
+    '''Return the tablebase at path, opened once per process and shared by
+    every caller, or None if there is no tablebase file.'''
+
+    if path not in _tablebases:
+	_tablebases[path] = Tablebase(path) if os.path.exists(path) else None
+    return _tablebases[path]
+
+def build_tablebase(path, max_empty=MAX_EMPTY, verbose=False):
+    '''Solve every position with up to max_empty empty tiles in the pawns'
+    region, and write the tablebase file.
+
+    --- Function Arguments ---
+    @path: the tablebase file to write
+    @max_empty: the most empty tiles in the pawns' region covered
+    @verbose: print the progress, one line per pattern size
+    @return: the number of positions written
+    '''
+
+    if not 0 <= max_empty <= PLIES: raise ValueError('max_empty out of range')
+    layout = _layout(max_empty)
+    board, values = BitBoard(layout[0]), {}
+    size = None
+    for tiles in _patterns(max_empty + 2):
+	if verbose and len(tiles) != size:
+	    size = len(tiles)
+	    print 'patterns of %d tiles; %d positions so far' % (size, len(values))
+	squares = [i*board.n + j for i, j in tiles]
+	mask = sum(board.bits[sq] for sq in squares)
+	for mover in squares:
+	    for other in squares:
+		if other != mover:
+		    _solve(mask ^ board.bits[mover] ^ board.bits[other], mover, other, board,
+			   layout, values)
+
+    records = sorted((_encode(key, layout[2]), value) for key, value in values.iteritems())
+    f = open(path, 'wb')
+    try:
+	f.write(HEADER.pack(MAGIC, max_empty, len(records)))
+	for key, value in records:
+	    f.write(key + chr(value))
+    finally:
+	f.close()
+    return len(records)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the endgame tablebase of Game Isolation.')
+    parser.add_argument('path', nargs='?', default=TABLEBASE_FILE,
+			help='tablebase file to write')
+    parser.add_argument('-e', '--max-empty', type=int, default=MAX_EMPTY,
+			help='empty tiles in the pawns\' region covered (default %d)' % MAX_EMPTY)
+    parser.add_argument('-v', '--verbose', action='store_true', help='print the progress')
+    args = parser.parse_args()
+
+    count = build_tablebase(args.path, args.max_empty, args.verbose)
+    print 'wrote', count, 'positions to', args.path
+
+if __name__ == '__main__': main()
@@ -0,0 +1,89 @@
+#!/usr/bin/python
+
+"""Module test_algo
+Tests of the search and the evaluation functions.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: test_algo.py
+
+"""
+
+import random
+import unittest
+
+from bitboard import BitBoard
+from ttable import TranspositionTable
+from moves import legal_moves
+from algo import *
+from algo import _child_score, _child_difference
+
+def _random_positions(seed, count, size=8):
+    '''Return 'count' positions reached by random moves, as tuples
+    (whose_ply, board), with the player to move having a move.'''
+
+    rng, positions = random.Random(seed), []
+    while len(positions) < count:
+	board, who = BitBoard(size), 'p1'
+	for ply in xrange(rng.randint(2, size*size // 2)):
+	    moves = sorted(legal_moves(who, board))
+	    if not moves: break
+	    board.set_move(rng.choice(moves), who)
+	    who = 'p1' if who == 'p2' else 'p2'
+	if legal_moves(who, board): positions.append((who, board))
+    return positions
+
+class EvaluationTest(unittest.TestCase):
+
+    def test_batch_equals_hef(self):
+	positions = _random_positions(1, 50) + _random_positions(2, 10, 5)
+	self.assertEqual(hef_batch(positions), [hef(who, board) for who, board in positions])
+
+    def test_children_equal_evaluators(self):
+	for who, board in _random_positions(3, 40):
+	    other = 'p1' if who == 'p2' else 'p2'
+	    pos = board.get_position(other)
+	    n, bits, rays, occupied = board.n, board.bits, board.rays, board.occupied
+	    rays_oppt = rays[pos[0]*n + pos[1]]
+	    for move in sorted(legal_moves(who, board)):
+		score = _child_score(move, n, bits, rays, rays_oppt, occupied)
+		difference = _child_difference(move, n, bits, rays, rays_oppt, occupied)
+		board.set_move(move, who)
+		self.assertEqual(score, -hef(other, board))
+		self.assertEqual(difference, -hef_difference(other, board))
+		board.delete_move(move, who)
+
+class PrincipalVariationTest(unittest.TestCase):
+
+    def setUp(self):
+	self.positions = _random_positions(4, 12) + _random_positions(5, 4, 6)
+
+    def test_same_move(self):
+	for who, board in self.positions:
+	    move = alpha_beta_root(who, board, 4, NEG_INFINITY, POS_INFINITY)
+	    self.assertEqual(pvs_root(who, board, 4, NEG_INFINITY, POS_INFINITY), move)
+
+    def test_same_move_with_table_and_ordering(self):
+	for who, board in self.positions:
+	    move = alpha_beta_root(who, board, 4, NEG_INFINITY, POS_INFINITY,
+				   TranspositionTable(1 << 16), ordering=MoveOrdering())
+	    self.assertEqual(pvs_root(who, board, 4, NEG_INFINITY, POS_INFINITY,
+				      TranspositionTable(1 << 16), ordering=MoveOrdering()), move)
+
+    def test_aspiration_windows(self):
+	for who, board in self.positions:
+	    move = alpha_beta_root(who, board, 4, NEG_INFINITY, POS_INFINITY)
+	    # guesses far off the score make the search fail low and high
+	    for guess in (-500.0, 0.0, 100.0, 500.0):
+		self.assertEqual(pvs_root(who, board, 4, NEG_INFINITY, POS_INFINITY,
+					  guess=guess, window=1.0), move)
+
+	    # iterative deepening reorders the root, which may break ties
+	    # between equal moves otherwise; both roots break them alike
+	    moves = [iterative_deepening(who, board, None, max_depth=4,
+					 tt=TranspositionTable(1 << 16),
+					 ordering=MoveOrdering(), root=root)
+		     for root in (alpha_beta_root, pvs_root)]
+	    self.assertEqual(moves[1], moves[0])
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,29 @@
+#!/usr/bin/python
+
+"""Module test_endgame
+Tests of the endgame solver.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: test_endgame.py
+
+"""
+
+import unittest
+
+from bitboard import BitBoard
+from endgame import _longest, _memo
+
+class LongestPathTest(unittest.TestCase):
+
+    def setUp(self):
+	_memo.clear()
+
+    def test_same_region_on_two_sizes(self):
+	# square 8 is (1, 0) on a board of length 8, but (0, 8) on one of
+	# length 12, out of reach of square 0 there
+	self.assertEqual(_longest(0, 1 << 8, BitBoard(8), [1000]), 1)
+	self.assertEqual(_longest(0, 1 << 8, BitBoard(12), [1000]), 0)
+	self.assertEqual(_longest(0, 1 << 8, BitBoard(8), [1000]), 1)
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/python
+
+"""Module test_game
+Tests of the game engine.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: test_game.py
+
+"""
+
+import random
+import unittest
+
+import game
+from bitboard import BitBoard
+from game import Game
+from ttable import TranspositionTable
+from moves import legal_moves
+from algo import *
+
+# nodes per AI move; a node budget keeps the searches deterministic
+NODES = 3000
+
+def _new_game(evaluate, moves):
+    "Return a game evaluating with 'evaluate', after 'moves' from the start."
+
+    g = Game(ui=object())
+    g.book, g.evaluate, g.node_limit = None, evaluate, NODES
+    for i, move in enumerate(moves):
+	g.cur_turn = 'p1' if i % 2 == 0 else 'p2'
+	g.make_move(move)
+    g.cur_turn = 'p1' if len(moves) % 2 == 0 else 'p2'
+    return g
+
+class SharedTableTest(unittest.TestCase):
+
+    def setUp(self):
+	game._tables.clear()
+
+    def test_tables_by_evaluator(self):
+	a, b, c = _new_game(hef, []), _new_game(hef, []), _new_game(EVALUATORS['area'], [])
+	self.assertTrue(a.get_tt() is b.get_tt())
+	self.assertTrue(a.get_tt() is not c.get_tt())
+
+    def test_other_evaluator_unaffected(self):
+	rng = random.Random(21)
+	for i in xrange(4):
+	    moves, board, who = [], BitBoard(), 'p1'
+	    for ply in xrange(6 + 2*i):
+		move = rng.choice(sorted(legal_moves(who, board)))
+		board.set_move(move, who)
+		moves.append(move)
+		who = 'p1' if who == 'p2' else 'p2'
+
+	    # a game on hef searches the position first
+	    _new_game(hef, moves).ai_goes()
+	    other = _new_game(EVALUATORS['area'], moves)
+	    other.ai_goes()
+	    expected = iterative_deepening(who, board, None, NODES,
+					   tt=TranspositionTable(Game.TT_ENTRIES),
+					   ordering=MoveOrdering(), evaluate=EVALUATORS['area'])
+	    self.assertEqual(other.moves[-1][1], expected)
+	    pass
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/python
+
+"""Module test_parallel
+Tests of the parallel root search.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: test_parallel.py
+
+"""
+
+import random
+import unittest
+import StringIO
+
+from bitboard import BitBoard
+from game import Game
+from moves import legal_moves
+from algo import *
+from parallel import parallel_alpha_beta_root, close_pool
+
+def _random_position(rng, plies, size=8):
+    "Play 'plies' random moves from the start; return (whose_ply, board)."
+
+    board, who = BitBoard(size), 'p1'
+    for i in xrange(plies):
+	moves = sorted(legal_moves(who, board))
+	if not moves: break
+	board.set_move(rng.choice(moves), who)
+	who = 'p1' if who == 'p2' else 'p2'
+    return who, board
+
+class ParallelSearchTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+	close_pool()
+
+    def test_same_move_as_serial(self):
+	rng = random.Random(11)
+	for plies in (4, 8, 12, 16, 20):
+	    who, board = _random_position(rng, plies)
+	    serial = alpha_beta_root(who, board, 4, NEG_INFINITY, POS_INFINITY)
+	    parallel = parallel_alpha_beta_root(who, board, 4, NEG_INFINITY, POS_INFINITY,
+						workers=3)
+	    self.assertEqual(parallel, serial)
+
+    def test_stats_and_budget(self):
+	who, board = _random_position(random.Random(5), 6)
+	stats = SearchStats()
+	move = parallel_alpha_beta_root(who, board, 4, NEG_INFINITY, POS_INFINITY,
+					stats=stats, workers=2)
+	self.assertEqual(stats.iterations[-1]['move'], move)
+	self.assertTrue(stats.iterations[-1]['nodes'] > 1)
+
+	budget = SearchBudget()
+	budget.stop()
+	self.assertRaises(SearchTimeout, parallel_alpha_beta_root, who, board, 4,
+			  NEG_INFINITY, POS_INFINITY, budget=budget, workers=2)
+
+    def test_game_algo(self):
+	game = Game(ui=object())
+	game.book, game.algo, game.time_limit = None, parallel_alpha_beta_root, 0.3
+	game.log = StringIO.StringIO()
+	who, game.board = _random_position(random.Random(3), 4)
+	game.cur_turn = who
+	move = game.board.get_position(who)
+	game.ai_goes()
+	self.assertNotEqual(game.board.get_position(who), move)
+	self.assertTrue(game.moves[-1][2] is not None)
+	self.assertTrue(game.log.getvalue())
+
+if __name__ == '__main__': unittest.main()
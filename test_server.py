@@ -0,0 +1,70 @@
+#!/usr/bin/python
+
+"""Module test_server
+Tests of the game server, with a client in the same process.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: test_server.py
+
+"""
+
+import unittest
+
+from server import Server, Engine, Client
+
+class ServerTest(unittest.TestCase):
+
+    def setUp(self):
+	self.server = Server(('127.0.0.1', 0), Engine(1, move_time=0.05), deadline=5.0)
+	self.server.start()
+	self.client = Client(self.server.server_address, timeout=30)
+
+    def tearDown(self):
+	self.client.close()
+	self.server.close()
+
+    def test_short_game(self):
+	state = self.client.request(op='new', size=4, engine_first=False, id=7)
+	self.assertTrue(state['ok'])
+	self.assertEqual(state['id'], 7)
+	self.assertEqual(state['turn'], 'p2')
+	for ply in xrange(16):
+	    if state['over']: break
+	    state = self.client.request(op='move', game=state['game'], move=state['moves'][0])
+	    self.assertTrue(state['ok'], state)
+	self.assertTrue(state['over'])
+	self.assertTrue(state['winner'] in ('p1', 'p2'))
+	reply = self.client.request(op='move', game=state['game'], move=[0, 0])
+	self.assertEqual(reply, {'ok': False, 'error': 'game over'})
+
+    def test_bad_size(self):
+	for size in (0, 1, 17):
+	    reply = self.client.request(op='new', size=size)
+	    self.assertEqual(reply, {'ok': False, 'error': 'bad size'})
+
+    def test_busy(self):
+	state = self.client.request(op='new', engine_first=False)
+	slots = self.server.engine.slots
+	taken = 0
+	while slots.acquire(False): taken += 1
+	try:
+	    reply = self.client.request(op='move', game=state['game'], move=state['moves'][0])
+	finally:
+	    for i in xrange(taken): slots.release()
+	self.assertEqual(reply, {'ok': False, 'error': 'busy'})
+
+	# the move was taken back, and can be sent again
+	reply = self.client.request(op='move', game=state['game'], move=state['moves'][0])
+	self.assertTrue(reply['ok'], reply)
+
+    def test_deadline(self):
+	state = self.client.request(op='new', engine_first=False)
+	reply = self.client.request(op='move', game=state['game'], move=state['moves'][0],
+				    deadline=0.001)
+	self.assertEqual(reply, {'ok': False, 'error': 'deadline exceeded'})
+	reply = self.client.request(op='state', game=state['game'])
+	self.assertEqual(reply['turn'], 'p2')
+	self.assertEqual(reply['moves'], state['moves'])
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/python
+
+"""Module tournament
+Harness for comparing the leaf evaluation functions of EVALUATORS: the
+cost of every evaluation function per call, and its strength at equal
+wall-clock time.
+
+The cost is timed on the benchmark positions of module bench. The
+strength is the win rate of engine-vs-engine games (see module selfplay)
+against a reference evaluation function, both sides searching with
+iterative deepening for the same time per move and swapping sides every
+other game. A cheap evaluation function searches deeper in that time, a
+costly one has to make up for it with better judgement.
+
+Usage: python tournament.py [-n GAMES] [-t SECONDS] [-j PROCESSES] [--reference NAME] [NAME ...]
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: tournament.py
+
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from bitboard import BitBoard
+from bench import POSITIONS, _setup
+from selfplay import Player, run
+from algo import *
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# the number of calls timed per position
+CALLS = 5000
+
+#=====================================================================#
+#                         Public Interface                            #
+#=====================================================================#
+
+def measure_cost(names, calls=CALLS):
+    '''Time evaluation functions on the benchmark positions.
+
+    @names: names of evaluation functions in EVALUATORS
+    @calls: the number of calls per position
+    @return: a dictionary {name: microseconds per call}
+    '''
+
+    boards = []
+    for set_depth, positions in POSITIONS.values():
+	for moves in positions:
+	    board = BitBoard()
+	    boards.append((_setup(board, moves), board))
+
+    costs = {}
+    for name in names:
+	evaluate = EVALUATORS[name]
+	start = time.time()
+	for who, board in boards:
+	    for i in xrange(calls): evaluate(who, board)
+	costs[name] = 1e6 * (time.time() - start) / (calls * len(boards))
+    return costs
+
+def measure_strength(name, reference='hef', games=20, time_limit=0.2, processes=None,
+		     seed=0):
+    '''Play evaluation function 'name' against 'reference' at equal time.
+
+    --- Function Arguments ---
+    @name: the name of the evaluation function tested
+    @reference: the name of the evaluation function it plays against
+    @games: the number of games; sides swap every other game
+    @time_limit: seconds per move for both sides
+    @processes: the number of worker processes; defaults to the number of CPUs
+    @seed: the seed of the random openings
+    @return: a dictionary {'games', 'wins', 'win_rate', 'nodes_per_sec'}
+    '''
+
+    player = Player(time_limit=time_limit, heuristic=name)
+    opponent = Player(time_limit=time_limit, heuristic=reference)
+    null = open(os.devnull, 'w')
+    try:
+	totals = run(player, opponent, games, processes, seed=seed, alternate=True, out=null)
+    finally:
+	null.close()
+    return {'games': totals['games'], 'wins': totals['wins']['a'],
+	    'win_rate': float(totals['wins']['a']) / (totals['games'] or 1),
+	    'nodes_per_sec': totals['nodes'] / (totals['seconds'] or 1e-9)}
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the leaf evaluation functions.')
+    parser.add_argument('names', nargs='*', metavar='NAME',
+			help='evaluation functions to compare (default: all)')
+    parser.add_argument('-n', '--games', type=int, default=20,
+			help='games against the reference per evaluation function')
+    parser.add_argument('-t', '--time', type=float, default=0.2, help='seconds per move')
+    parser.add_argument('-j', '--processes', type=int, default=None,
+			help='worker processes (default: number of CPUs)')
+    parser.add_argument('--reference', default='hef', choices=sorted(EVALUATORS),
+			help='the evaluation function played against (default hef)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random openings')
+    args = parser.parse_args()
+
+    names = args.names or sorted(EVALUATORS)
+    for name in names:
+	if name not in EVALUATORS: parser.error('unknown evaluation function: %s' % name)
+
+    costs = measure_cost(names)
+    print '%-12s %10s %8s %9s %12s' % ('evaluator', 'us/call', 'wins', 'win rate', 'nodes/sec')
+    for name in names:
+	if name == args.reference:
+	    print '%-12s %10.2f %8s %9s %12s' % (name, costs[name], '-', '-', '-')
+	    continue
+	result = measure_strength(name, args.reference, args.games, args.time,
+				  args.processes, args.seed)
+	print '%-12s %10.2f %4d/%-3d %8.0f%% %12.0f' % (
+	    name, costs[name], result['wins'], result['games'], 100*result['win_rate'],
+	    result['nodes_per_sec'])
+	sys.stdout.flush()
+
+if __name__ == '__main__': main()
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+
+"""Module ttable
+Zobrist hashing and a transposition table for the Alpha-Beta search.
+
+@author: Henry Huang (keenhenry1109@gmail.com)
+@date: 10/18/2026
+@file: ttable.py
+
+"""
+
+import random
+
+#=====================================================================#
+#                         Symbolic Constants                          #
+#=====================================================================#
+
+# bound types of a table entry
+EXACT = 0       # score is the exact minimax value
+LOWER = 1       # score is a lower bound (the search failed high)
+UPPER = 2       # score is an upper bound (the search failed low)
+
+# seed of the Zobrist keys; fixed so hashes are the same across runs
+ZOBRIST_SEED = 20101101
+
+# Zobrist keys, one entry per board size
+_keys = {}
+
+def zobrist_keys(size):
+    '''Return the Zobrist keys (mined, pawn_p1, pawn_p2, side) for a board of
+    length 'size'. The first three are indexed by square (i*size+j); 'side'
+    is xor-ed in when player 2 is to move.
+    '''
+
+    if size not in _keys:
+	rng = random.Random(ZOBRIST_SEED + size)
+	rand64 = lambda: rng.getrandbits(64)
+	mined = tuple(rand64() for sq in xrange(size*size))
+	pawn_p1 = tuple(rand64() for sq in xrange(size*size))
+	pawn_p2 = tuple(rand64() for sq in xrange(size*size))
+	_keys[size] = (mined, pawn_p1, pawn_p2, rand64())
+    return _keys[size]
+
+class TranspositionTable(object):
+    '''Class TranspositionTable
+
+    A fixed-size hash table of searched positions. Every slot index holds
+    two entries: a depth-preferred one, only replaced by searches at least
+    as deep, and an always-replace one taking whatever the first rejects.
+    An entry is a tuple (key, depth, flag, score, move).
+    '''
+
+    def __init__(self, max_entries=1<<20):
+	'''
+	@max_entries: the maximum number of entries the table holds
+	'''
+
+	self.slots = max(max_entries // 2, 1)
+	self.clear()
+
+    def __len__(self):
+	"Return the number of entries stored."
+	return (self.slots - self.deep.count(None)) + (self.slots - self.recent.count(None))
+
+    def probe(self, key):
+	'''Look up position 'key'.
+
+	@key: the Zobrist hash of the position (side to move included)
+	@return: the entry tuple, or None if the position is not stored
+	'''
+
+	i = key % self.slots
+	entry = self.deep[i]
+	if entry is not None and entry[0] == key: return entry
+	entry = self.recent[i]
+	if entry is not None and entry[0] == key: return entry
+	return None
+
+    def store(self, key, depth, flag, score, move):
+	'''Store a search result for position 'key'.
+
+	--- Function Arguments ---
+	@key: the Zobrist hash of the position (side to move included)
+	@depth: the depth the position was searched to
+	@flag: EXACT, LOWER or UPPER
+	@score: the score returned by the search
+	@move: the best move found, or None
+	'''
+
+	i = key % self.slots
+	entry = self.deep[i]
+	if entry is None or entry[0] == key or depth >= entry[1]:
+	    self.deep[i] = (key, depth, flag, score, move)
+	else:
+	    self.recent[i] = (key, depth, flag, score, move)
+
+    def clear(self):
+	"Remove all entries, e.g. when a new game starts."
+	self.deep = [None] * self.slots
+	self.recent = [None] * self.slots
@@ -64,6 +64,14 @@ class Terminal(object):
 	"Print out game board's string representation on terminal."
 	print self.board
 
+    def print_hints(self, moves):
+	'''Print out the moves the user can make.
+
+	@moves: the legal moves, an iterable of tuples
+	'''
+
+	print 'Your moves:', ' '.join('(%d, %d)' % move for move in sorted(moves))
+
     def print_winner(self, winner):
 	"Print the winner of the game."
 